@@ -1,104 +1,463 @@
-import os
-import json
-from typing import Optional
-from groq import Groq
-from models import ParsedUserInfo
-
-
-class AIParser:
-    def __init__(self, api_key: str):
-        self.client = Groq(api_key=api_key)
-    
-    def parse_user_info(self, user_input: str) -> ParsedUserInfo:
-        """
-        Parse user input using AI to extract structured information
-        """
-        system_prompt = """
-        You are an expert data parser. Parse the given text to extract user information.
-        Return ONLY a JSON object with the following exact structure:
-        {
-            "first_name": "extracted first name",
-            "last_name": "extracted last name", 
-            "phone_number": "extracted phone number",
-            "street_address": "extracted street address including number",
-            "apartment_number": "extracted apartment/unit number or null",
-            "city": "extracted city",
-            "state": "extracted state/province",
-            "country": "extracted country",
-            "zip_code": "extracted zip/postal code"
-        }
-        
-        Rules:
-        - Extract information as accurately as possible from the text
-        - If apartment number is not mentioned, use null
-        - Format phone numbers consistently (e.g., +1-555-123-4567)
-        - Use proper capitalization for names and places
-        - For any required field that cannot be determined from the text:
-          * For names: use "Unknown"
-          * For phone_number: use "Not provided"
-          * For addresses: use "Not provided"
-          * For city/state/country: use "Unknown"
-          * For zip_code: use "00000"
-        - NEVER use null for required string fields - always provide a string value
-        - Return ONLY the JSON, no other text
-        """
-        
-        try:
-            chat_completion = self.client.chat.completions.create(
-                messages=[
-                    {
-                        "role": "system",
-                        "content": system_prompt
-                    },
-                    {
-                        "role": "user", 
-                        "content": user_input
-                    }
-                ],
-                model="llama-3.1-8b-instant",
-                temperature=0.1,
-                max_tokens=500
-            )
-            
-            response_content = chat_completion.choices[0].message.content.strip()
-            
-            # Parse the JSON response
-            parsed_data = json.loads(response_content)
-            
-            # Ensure all required fields have string values (never None)
-            defaults = {
-                "first_name": "Unknown",
-                "last_name": "Unknown", 
-                "phone_number": "Not provided",
-                "street_address": "Not provided",
-                "city": "Unknown",
-                "state": "Unknown",
-                "country": "Unknown",
-                "zip_code": "00000"
-            }
-            
-            # Clean the parsed data
-            for field, default_value in defaults.items():
-                if field not in parsed_data or parsed_data[field] is None or parsed_data[field] == "":
-                    parsed_data[field] = default_value
-                elif isinstance(parsed_data[field], str):
-                    parsed_data[field] = parsed_data[field].strip()
-                    if not parsed_data[field]:  # Empty string after strip
-                        parsed_data[field] = default_value
-            
-            # apartment_number can be None, but if it's an empty string, set to None
-            if "apartment_number" in parsed_data:
-                if parsed_data["apartment_number"] == "" or parsed_data["apartment_number"] == "null":
-                    parsed_data["apartment_number"] = None
-            
-            # Create and return ParsedUserInfo object
-            return ParsedUserInfo(**parsed_data)
-            
-        except json.JSONDecodeError as e:
-            raise ValueError(f"Failed to parse AI response as JSON: {e}")
-        except Exception as e:
-            raise ValueError(f"AI parsing failed: {e}")
-
-
-# Global instance
+import asyncio
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import httpx
+from groq import Groq, AsyncGroq, BadRequestError
+from pydantic import TypeAdapter, ValidationError
+from models import ParsedUserInfo
+
+# Precompiled validator: parses and validates the model's JSON response in a
+# single Rust-native pass instead of json.loads + a Python cleanup loop.
+_PARSED_USER_INFO = TypeAdapter(ParsedUserInfo)
+_PARSED_USER_INFO_LIST = TypeAdapter(List[ParsedUserInfo])
+
+
+# Static parsing instructions hoisted to module level so every request sends a
+# byte-identical prefix. Providers key their prompt/KV caches on the exact
+# prefix bytes, so keeping this stable lets repeat calls skip most prefill cost.
+SYSTEM_PROMPT = """
+        You are an expert data parser. Parse the given text to extract user information.
+        Return ONLY a JSON object with the following exact structure:
+        {
+            "first_name": "extracted first name",
+            "last_name": "extracted last name", 
+            "phone_number": "extracted phone number",
+            "street_address": "extracted street address including number",
+            "apartment_number": "extracted apartment/unit number or null",
+            "city": "extracted city",
+            "state": "extracted state/province",
+            "country": "extracted country",
+            "zip_code": "extracted zip/postal code"
+        }
+        
+        Rules:
+        - Extract information as accurately as possible from the text
+        - If apartment number is not mentioned, use null
+        - Format phone numbers consistently (e.g., +1-555-123-4567)
+        - Use proper capitalization for names and places
+        - For any required field that cannot be determined from the text:
+          * For names: use "Unknown"
+          * For phone_number: use "Not provided"
+          * For addresses: use "Not provided"
+          * For city/state/country: use "Unknown"
+          * For zip_code: use "00000"
+        - NEVER use null for required string fields - always provide a string value
+        - Return ONLY the JSON, no other text
+        """
+
+# Cache-marked form of the system prompt: the static block carries a
+# cache_control breakpoint so compatible providers can serve it from their
+# prompt cache. The dynamic user message must stay after the breakpoint.
+CACHED_SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": [
+        {
+            "type": "text",
+            "text": SYSTEM_PROMPT,
+            "cache_control": {"type": "ephemeral"},
+        }
+    ],
+}
+
+# Plain-string fallback for providers that reject structured content blocks;
+# the byte-for-byte identical prefix still hits server-side prefix caching.
+PLAIN_SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": SYSTEM_PROMPT,
+}
+
+
+MODEL = "llama-3.1-8b-instant"
+
+# Maximum number of Groq requests in flight at once. Keeps the event loop from
+# piling unbounded concurrent requests onto the provider.
+MAX_CONCURRENT_REQUESTS = 32
+
+# Maximum number of parsed results kept in the content-addressed cache.
+PARSE_CACHE_SIZE = 4096
+
+# Attempts per parse: one initial call plus retries that feed the validation
+# error back to the model.
+MAX_PARSE_ATTEMPTS = 3
+
+# Micro-batching: requests arriving within this window are coalesced into a
+# single Groq call, up to the batch size cap.
+BATCH_WINDOW_SECONDS = 0.02
+BATCH_MAX_SIZE = 8
+
+# Shared connection-pool settings for the Groq HTTP clients: generous
+# keepalive so concurrent calls reuse warm TLS connections instead of paying
+# handshake round-trips.
+POOL_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+HTTP_TIMEOUT = 30.0
+
+
+def _build_http_clients() -> "Tuple[httpx.Client, httpx.AsyncClient]":
+    """Build the pooled sync/async transports, with HTTP/2 when available"""
+    try:
+        return (
+            httpx.Client(http2=True, limits=POOL_LIMITS, timeout=HTTP_TIMEOUT),
+            httpx.AsyncClient(http2=True, limits=POOL_LIMITS, timeout=HTTP_TIMEOUT),
+        )
+    except ImportError:
+        # http2 extra (h2) not installed; plain HTTP/1.1 keepalive pooling
+        return (
+            httpx.Client(limits=POOL_LIMITS, timeout=HTTP_TIMEOUT),
+            httpx.AsyncClient(limits=POOL_LIMITS, timeout=HTTP_TIMEOUT),
+        )
+
+
+# Prefixed to the numbered inputs of a coalesced request. Lives in the user
+# message so the cached system prompt stays byte-identical.
+BATCH_USER_INSTRUCTION = (
+    "Parse each of the following numbered inputs separately. "
+    "Return ONLY a JSON array with exactly one object per input, in the same "
+    "order, each following the schema above:"
+)
+
+
+def _cache_key(user_input: str) -> str:
+    """Content-addressed cache key over (model, system prompt, user input).
+
+    Each component is length-prefixed before hashing so distinct component
+    boundaries can never collide (e.g. "ab"+"c" vs "a"+"bc"). The user input
+    is normalized since whitespace/case variants parse identically.
+    """
+    hasher = hashlib.sha256()
+    for part in (MODEL, SYSTEM_PROMPT, user_input.strip().lower()):
+        encoded = part.encode("utf-8")
+        hasher.update(len(encoded).to_bytes(8, "big"))
+        hasher.update(encoded)
+    return hasher.hexdigest()
+
+
+class _JsonBalanceTracker:
+    """Tracks brace balance across streamed text so callers can stop reading
+    as soon as the top-level JSON object is syntactically complete.
+
+    Braces inside string literals (and escaped quotes within them) are
+    ignored.
+    """
+
+    def __init__(self):
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._started = False
+
+    def feed(self, text: str) -> bool:
+        """Consume a delta; return True once the JSON object has closed"""
+        for ch in text:
+            if self._escaped:
+                self._escaped = False
+                continue
+            if self._in_string:
+                if ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+            if ch == '"':
+                self._in_string = True
+            elif ch == "{":
+                self._depth += 1
+                self._started = True
+            elif ch == "}":
+                self._depth -= 1
+        return self._started and self._depth <= 0
+
+
+class AIParser:
+    def __init__(self, api_key: str):
+        http_client, ahttp_client = _build_http_clients()
+        self.client = Groq(api_key=api_key, http_client=http_client)
+        self.aclient = AsyncGroq(api_key=api_key, http_client=ahttp_client)
+        self._semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        self._supports_cache_control = True
+        self._supports_json_mode = True
+        # LRU cache of parse results keyed by content hash; repeat inputs
+        # return without a network hop.
+        self._parse_cache: "OrderedDict[str, ParsedUserInfo]" = OrderedDict()
+        # In-flight async parses keyed by content hash; duplicate inputs that
+        # arrive before the first result lands share one Groq call.
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # Micro-batcher state, created lazily once an event loop is running.
+        self._batch_queue: Optional[asyncio.Queue] = None
+        self._batch_task: Optional[asyncio.Task] = None
+
+    def _cache_get(self, key: str) -> Optional[ParsedUserInfo]:
+        """Return a cached parse result, refreshing its LRU position"""
+        cached = self._parse_cache.get(key)
+        if cached is None:
+            return None
+        self._parse_cache.move_to_end(key)
+        # Hand out a copy so callers can't mutate the cached entry
+        return cached.model_copy()
+
+    def _cache_put(self, key: str, result: ParsedUserInfo) -> None:
+        """Store a parse result, evicting the least recently used entry"""
+        self._parse_cache[key] = result.model_copy()
+        self._parse_cache.move_to_end(key)
+        while len(self._parse_cache) > PARSE_CACHE_SIZE:
+            self._parse_cache.popitem(last=False)
+
+    def _completion_kwargs(self, user_messages: List[dict], max_tokens: int, want_json_mode: bool) -> dict:
+        """Assemble create() kwargs honoring the provider capability flags"""
+        system = CACHED_SYSTEM_MESSAGE if self._supports_cache_control else PLAIN_SYSTEM_MESSAGE
+        kwargs = {
+            "messages": [system, *user_messages],
+            "model": MODEL,
+            "temperature": 0.1,
+            "max_tokens": max_tokens,
+            "stream": True,
+        }
+        if want_json_mode and self._supports_json_mode:
+            # JSON mode makes schema-invalid responses statistically rare
+            kwargs["response_format"] = {"type": "json_object"}
+        return kwargs
+
+    def _degrade_on_bad_request(self, used_json_mode: bool) -> None:
+        """Disable the most likely rejected capability, or re-raise"""
+        if used_json_mode and self._supports_json_mode:
+            self._supports_json_mode = False
+        elif self._supports_cache_control:
+            self._supports_cache_control = False
+        else:
+            raise
+
+    def _create_completion(self, user_messages: List[dict], max_tokens: int = 500,
+                           want_json_mode: bool = True):
+        """Start the chat request as a stream, degrading gracefully when the
+        provider rejects JSON mode or cache-marked content blocks"""
+        while True:
+            kwargs = self._completion_kwargs(user_messages, max_tokens, want_json_mode)
+            try:
+                return self.client.chat.completions.create(**kwargs)
+            except BadRequestError:
+                self._degrade_on_bad_request("response_format" in kwargs)
+
+    async def _acreate_completion(self, user_messages: List[dict], max_tokens: int = 500,
+                                  want_json_mode: bool = True):
+        """Async variant of _create_completion"""
+        while True:
+            kwargs = self._completion_kwargs(user_messages, max_tokens, want_json_mode)
+            try:
+                return await self.aclient.chat.completions.create(**kwargs)
+            except BadRequestError:
+                self._degrade_on_bad_request("response_format" in kwargs)
+
+    def _collect_stream(self, stream) -> str:
+        """Accumulate streamed deltas, stopping as soon as the JSON closes"""
+        buf = []
+        tracker = _JsonBalanceTracker()
+        for chunk in stream:
+            delta = chunk.choices[0].delta.content or ""
+            buf.append(delta)
+            if tracker.feed(delta):
+                break
+        return "".join(buf)
+
+    async def _acollect_stream(self, stream) -> str:
+        """Async variant of _collect_stream"""
+        buf = []
+        tracker = _JsonBalanceTracker()
+        async for chunk in stream:
+            delta = chunk.choices[0].delta.content or ""
+            buf.append(delta)
+            if tracker.feed(delta):
+                break
+        return "".join(buf)
+
+    @staticmethod
+    def _feedback_messages(response_content: str, error: ValidationError) -> List[dict]:
+        """Messages appended so the retry sees its own invalid output"""
+        return [
+            {"role": "assistant", "content": response_content},
+            {
+                "role": "user",
+                "content": f"Your output had error: {error}. "
+                           "Return only valid JSON matching the schema."
+            },
+        ]
+
+    def parse_user_info(self, user_input: str) -> ParsedUserInfo:
+        """
+        Parse user input using AI to extract structured information
+        """
+        key = _cache_key(user_input)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
+        user_messages = [{"role": "user", "content": user_input}]
+        last_error: Optional[ValidationError] = None
+        for attempt in range(MAX_PARSE_ATTEMPTS):
+            if attempt:
+                time.sleep(1.0 * attempt)
+            try:
+                stream = self._create_completion(user_messages)
+                response_content = self._collect_stream(stream).strip()
+            except Exception as e:
+                raise ValueError(f"AI parsing failed: {e}")
+            try:
+                result = self._process_response(response_content)
+            except ValidationError as e:
+                # Feed the error back so the retry can correct itself
+                last_error = e
+                user_messages.extend(self._feedback_messages(response_content, e))
+                continue
+            self._cache_put(key, result)
+            return result
+
+        raise ValueError(f"Failed to parse AI response as JSON: {last_error}")
+
+    async def parse_user_info_async(self, user_input: str) -> ParsedUserInfo:
+        """
+        Async variant of parse_user_info; lets the event loop overlap many
+        Groq round-trips instead of blocking a worker thread per request
+        """
+        key = _cache_key(user_input)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
+        # Coalesce concurrent duplicates (e.g. double form submits): followers
+        # wait on the leader's future instead of issuing their own call.
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return (await inflight).model_copy()
+
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await self._parse_async_uncached(key, user_input)
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved in case no follower is waiting
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._inflight[key]
+
+    async def _parse_async_uncached(self, key: str, user_input: str) -> ParsedUserInfo:
+        """Single uncoalesced parse: the retry loop behind parse_user_info_async"""
+        user_messages = [{"role": "user", "content": user_input}]
+        last_error: Optional[ValidationError] = None
+        for attempt in range(MAX_PARSE_ATTEMPTS):
+            if attempt:
+                await asyncio.sleep(1.0 * attempt)
+            try:
+                async with self._semaphore:
+                    stream = await self._acreate_completion(user_messages)
+                    response_content = (await self._acollect_stream(stream)).strip()
+            except Exception as e:
+                raise ValueError(f"AI parsing failed: {e}")
+            try:
+                result = self._process_response(response_content)
+            except ValidationError as e:
+                # Feed the error back so the retry can correct itself
+                last_error = e
+                user_messages.extend(self._feedback_messages(response_content, e))
+                continue
+            self._cache_put(key, result)
+            return result
+
+        raise ValueError(f"Failed to parse AI response as JSON: {last_error}")
+
+    async def parse_user_info_batched(self, user_input: str) -> ParsedUserInfo:
+        """Parse via the micro-batcher: requests arriving within a short
+        window share one Groq round-trip and split the response array.
+        """
+        key = _cache_key(user_input)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
+        if self._batch_queue is None:
+            self._batch_queue = asyncio.Queue()
+            self._batch_task = asyncio.create_task(self._batch_loop())
+
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        await self._batch_queue.put((user_input, future))
+        return await future
+
+    async def _batch_loop(self):
+        """Collect requests for one window, then dispatch them as a batch"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch: List[Tuple[str, asyncio.Future]] = [await self._batch_queue.get()]
+            deadline = loop.time() + BATCH_WINDOW_SECONDS
+            while len(batch) < BATCH_MAX_SIZE:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._batch_queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            await self._dispatch_batch(batch)
+
+    async def _dispatch_batch(self, batch: "List[Tuple[str, asyncio.Future]]"):
+        """Resolve a collected batch, falling back to single calls on failure"""
+        if len(batch) > 1:
+            try:
+                results = await self._parse_batch([text for text, _ in batch])
+                for (text, future), result in zip(batch, results):
+                    self._cache_put(_cache_key(text), result)
+                    if not future.done():
+                        future.set_result(result)
+                return
+            except Exception:
+                pass  # Batched call failed; retry each input individually
+
+        for text, future in batch:
+            try:
+                result = await self.parse_user_info_async(text)
+            except Exception as exc:
+                if not future.done():
+                    future.set_exception(exc)
+            else:
+                if not future.done():
+                    future.set_result(result)
+
+    async def _parse_batch(self, inputs: List[str]) -> List[ParsedUserInfo]:
+        """Send one Groq request covering several inputs, in order"""
+        numbered = "\n".join(f"{i}) {text}" for i, text in enumerate(inputs, 1))
+        user_content = f"{BATCH_USER_INSTRUCTION}\n{numbered}"
+
+        async with self._semaphore:
+            # Budget enough output tokens for one object per input. JSON mode
+            # is skipped here: it forces a single object, not an array.
+            stream = await self._acreate_completion(
+                [{"role": "user", "content": user_content}],
+                max_tokens=500 * len(inputs),
+                want_json_mode=False,
+            )
+            buf = []
+            async for chunk in stream:
+                buf.append(chunk.choices[0].delta.content or "")
+            response_content = "".join(buf).strip()
+
+        results = _PARSED_USER_INFO_LIST.validate_json(response_content)
+        if len(results) != len(inputs):
+            raise ValueError(
+                f"Batched parse returned {len(results)} objects for {len(inputs)} inputs"
+            )
+        return results
+
+    def _process_response(self, response_content: str) -> ParsedUserInfo:
+        """Parse and validate the model's JSON response in one pass.
+
+        Field defaults and empty-value coercion live on ParsedUserInfo itself,
+        so no per-field cleanup loop is needed here.
+        """
+        return _PARSED_USER_INFO.validate_json(response_content)
+
+
+# Global instance
 ai_parser = AIParser(api_key=os.getenv("GROQ_API_KEY", "your-groq-api-key-here"))
\ No newline at end of file
@@ -1,390 +1,893 @@
-from typing import List, Optional, Dict, Any
-from models import Movie, MovieFilters, CreateMovieCommand, UpdateMovieCommand, UserProfile, ParsedUserInfo
-import threading
-import pandas as pd
-import json
-import os
-from pathlib import Path
-import math
-from datetime import datetime
-
-
-class MovieDatabase:
-    def __init__(self, csv_path: str = None):
-        self._movies: List[Movie] = []
-        self._users: List[UserProfile] = []
-        self._next_movie_id = 1
-        self._next_user_id = 1
-        self._lock = threading.Lock()
-        
-        # Auto-detect which dataset to use
-        if csv_path:
-            self.csv_path = Path(csv_path)
-        else:
-            # Check if full dataset exists and has been set up
-            full_dataset = Path("../Semantic_Recent.csv")
-            sample_dataset = Path("../sample_movies.csv")
-            
-            if full_dataset.exists() and self._is_full_dataset(full_dataset):
-                self.csv_path = full_dataset
-                print("🎉 Using full dataset with 4800+ movies!")
-            elif sample_dataset.exists():
-                self.csv_path = sample_dataset
-                print("📋 Using sample dataset. Run './setup-dataset.sh' to upgrade to full dataset.")
-            else:
-                self.csv_path = full_dataset  # Fallback
-                print("⚠️  No dataset found. Please run './setup-dataset.sh' to set up the movie database.")
-        
-        self._loaded = False
-        self._load_chunk_size = 200  # Process 200 rows at a time
-        
-        # Lazy load - only load when first requested
-        print(f"MovieDatabase initialized. CSV will be loaded from {self.csv_path} on first request.")
-    
-    def _is_full_dataset(self, csv_path: Path) -> bool:
-        """Check if the CSV file contains the full dataset (1000+ movies)"""
-        try:
-            with open(csv_path, 'r', encoding='latin-1') as f:
-                line_count = sum(1 for line in f) - 1  # Subtract header
-                return line_count >= 1000
-        except Exception:
-            return False
-    
-    def _ensure_loaded(self):
-        """Ensure CSV is loaded (lazy loading)"""
-        if self._loaded:
-            return
-            
-        with self._lock:
-            if self._loaded:  # Double-check pattern
-                return
-                
-            try:
-                self._load_from_csv_chunked()
-                self._loaded = True
-            except Exception as e:
-                print(f"Error loading CSV: {e}")
-                self._movies = []
-                self._loaded = True  # Mark as loaded even if failed to prevent retries
-    
-    def _load_from_csv_chunked(self):
-        """Load movies from CSV file in chunks to prevent timeouts"""
-        if not self.csv_path.exists():
-            print(f"CSV file not found at {self.csv_path}. Starting with empty database.")
-            return
-        
-        print(f"Loading movies from {self.csv_path} in chunks...")
-        
-        # Try different encodings
-        encodings = ['latin-1', 'utf-8', 'iso-8859-1', 'cp1252']
-        encoding_used = None
-        
-        for encoding in encodings:
-            try:
-                # Test read with first few rows
-                pd.read_csv(self.csv_path, encoding=encoding, nrows=5, on_bad_lines='skip')
-                encoding_used = encoding
-                print(f"Using encoding: {encoding}")
-                break
-            except Exception:
-                continue
-        
-        if not encoding_used:
-            raise Exception("Could not find compatible encoding")
-        
-        self._movies = []
-        processed_count = 0
-        
-        try:
-            # Read CSV in chunks to prevent memory issues
-            chunk_reader = pd.read_csv(
-                self.csv_path,
-                encoding=encoding_used,
-                chunksize=self._load_chunk_size,
-                on_bad_lines='skip',
-                low_memory=False
-            )
-            
-            for chunk_num, chunk_df in enumerate(chunk_reader, 1):
-                print(f"Processing chunk {chunk_num} ({len(chunk_df)} rows)...")
-                
-                for idx, row in chunk_df.iterrows():
-                    try:
-                        movie_id = processed_count + (idx - chunk_df.index[0]) + 1
-                        movie = Movie.from_csv_row(row.to_dict(), movie_id)
-                        self._movies.append(movie)
-                    except Exception as e:
-                        # Silently skip problematic rows to prevent console spam
-                        continue
-                
-                processed_count = len(self._movies)
-                
-                # Progress update every 5 chunks
-                if chunk_num % 5 == 0:
-                    print(f"  Processed {processed_count} movies so far...")
-            
-            self._next_movie_id = len(self._movies) + 1
-            print(f"✅ Successfully loaded {len(self._movies)} movies")
-            
-        except Exception as e:
-            print(f"Error during chunked loading: {e}")
-            # Continue with whatever movies were loaded
-            self._next_movie_id = len(self._movies) + 1
-    
-    def _save_to_csv(self):
-        """Save current movies back to CSV file"""
-        try:
-            with self._lock:
-                # Convert movies to DataFrame format
-                data = []
-                for movie in self._movies:
-                    row = {
-                        "title_y": movie.title,
-                        "overview": movie.overview,
-                        "genres": json.dumps(movie.genres) if movie.genres else "",
-                        "keywords": json.dumps(movie.keywords) if movie.keywords else "",
-                        "tagline": movie.tagline,
-                        "cast": json.dumps(movie.cast) if movie.cast else "",
-                        "crew": json.dumps(movie.crew) if movie.crew else "",
-                        "production_companies": json.dumps(movie.production_companies) if movie.production_companies else "",
-                        "production_countries": json.dumps(movie.production_countries) if movie.production_countries else "",
-                        "spoken_languages": json.dumps(movie.spoken_languages) if movie.spoken_languages else "",
-                        "original_language": movie.original_language,
-                        "original_title": movie.original_title,
-                        "release_date": movie.release_date,
-                        "runtime": movie.runtime,
-                        "vote_average": movie.vote_average,
-                        "vote_count": movie.vote_count,
-                        "popularity": movie.popularity
-                    }
-                    data.append(row)
-                
-                df = pd.DataFrame(data)
-                df.to_csv(self.csv_path, index=False)
-                print(f"Saved {len(self._movies)} movies to CSV")
-        
-        except Exception as e:
-            print(f"Error saving to CSV: {e}")
-    
-    def get_movies_paginated(self, page: int = 1, size: int = 20, filters: Optional[MovieFilters] = None) -> tuple[List[Movie], int]:
-        """Get paginated movies with optional filtering"""
-        self._ensure_loaded()  # Lazy load
-        
-        with self._lock:
-            filtered_movies = self._apply_filters(self._movies.copy(), filters)
-            total = len(filtered_movies)
-            
-            # Calculate pagination
-            start_idx = (page - 1) * size
-            end_idx = start_idx + size
-            
-            return filtered_movies[start_idx:end_idx], total
-    
-    def _apply_filters(self, movies: List[Movie], filters: Optional[MovieFilters]) -> List[Movie]:
-        """Apply filters to movie list"""
-        if not filters:
-            return movies
-        
-        filtered = movies
-        
-        # Search filter
-        if filters.search:
-            search_term = filters.search.lower()
-            filtered = [
-                movie for movie in filtered
-                if (movie.title and search_term in movie.title.lower()) or
-                   (movie.overview and search_term in movie.overview.lower()) or
-                   any(cast_member.get("name", "").lower().find(search_term) >= 0 for cast_member in movie.cast) or
-                   any(crew_member.get("name", "").lower().find(search_term) >= 0 for crew_member in movie.crew)
-            ]
-        
-        # Genre filter
-        if filters.genres:
-            filtered = [
-                movie for movie in filtered
-                if any(genre.get("name", "").lower() in [g.lower() for g in filters.genres] for genre in movie.genres)
-            ]
-        
-        # Year filters
-        if filters.year_from or filters.year_to:
-            filtered = [
-                movie for movie in filtered
-                if self._check_year_filter(movie.release_date, filters.year_from, filters.year_to)
-            ]
-        
-        # Rating filters
-        if filters.rating_from is not None:
-            filtered = [movie for movie in filtered if movie.vote_average and movie.vote_average >= filters.rating_from]
-        
-        if filters.rating_to is not None:
-            filtered = [movie for movie in filtered if movie.vote_average and movie.vote_average <= filters.rating_to]
-        
-        # Runtime filters
-        if filters.runtime_from is not None:
-            filtered = [movie for movie in filtered if movie.runtime and movie.runtime >= filters.runtime_from]
-        
-        if filters.runtime_to is not None:
-            filtered = [movie for movie in filtered if movie.runtime and movie.runtime <= filters.runtime_to]
-        
-        # Language filter
-        if filters.language:
-            filtered = [movie for movie in filtered if movie.original_language == filters.language]
-        
-        # Favorite filter
-        if filters.is_favorite is not None:
-            filtered = [movie for movie in filtered if movie.is_favorite == filters.is_favorite]
-        
-        # Personal rating filters
-        if filters.personal_rating_from is not None:
-            filtered = [movie for movie in filtered if movie.personal_rating and movie.personal_rating >= filters.personal_rating_from]
-        
-        if filters.personal_rating_to is not None:
-            filtered = [movie for movie in filtered if movie.personal_rating and movie.personal_rating <= filters.personal_rating_to]
-        
-        return filtered
-    
-    def _check_year_filter(self, release_date: Optional[str], year_from: Optional[int], year_to: Optional[int]) -> bool:
-        """Check if movie release date falls within year range"""
-        if not release_date:
-            return False
-        
-        try:
-            year = int(release_date.split("-")[0])
-            if year_from and year < year_from:
-                return False
-            if year_to and year > year_to:
-                return False
-            return True
-        except (ValueError, IndexError):
-            return False
-    
-    def create_movie(self, command: CreateMovieCommand) -> int:
-        """Create a new movie"""
-        self._ensure_loaded()  # Lazy load
-        
-        with self._lock:
-            movie = Movie(
-                id=self._next_movie_id,
-                title=command.title,
-                overview=command.overview,
-                genres=command.genres,
-                keywords=command.keywords,
-                tagline=command.tagline,
-                cast=command.cast,
-                crew=command.crew,
-                production_companies=command.production_companies,
-                production_countries=command.production_countries,
-                spoken_languages=command.spoken_languages,
-                original_language=command.original_language,
-                original_title=command.original_title,
-                release_date=command.release_date,
-                runtime=command.runtime,
-                vote_average=command.vote_average,
-                vote_count=command.vote_count,
-                popularity=command.popularity,
-                is_favorite=False,
-                personal_rating=None,
-                personal_notes=None
-            )
-            self._movies.append(movie)
-            self._next_movie_id += 1
-            
-            # Skip CSV saving for new movies to improve performance
-            # TODO: Implement proper persistence if needed
-            
-            return movie.id
-    
-    def update_movie(self, id: int, command: UpdateMovieCommand) -> bool:
-        """Update an existing movie"""
-        self._ensure_loaded()  # Lazy load
-        
-        with self._lock:
-            for movie in self._movies:
-                if movie.id == id:
-                    if command.title is not None:
-                        movie.title = command.title
-                    if command.overview is not None:
-                        movie.overview = command.overview
-                    if command.is_favorite is not None:
-                        movie.is_favorite = command.is_favorite
-                    if command.personal_rating is not None:
-                        movie.personal_rating = command.personal_rating
-                    if command.personal_notes is not None:
-                        movie.personal_notes = command.personal_notes
-                    
-                    # Skip CSV saving for updates to improve performance
-                    # Changes are kept in memory only
-                    
-                    return True
-            return False
-    
-    def delete_movie(self, id: int) -> bool:
-        """Delete a movie"""
-        self._ensure_loaded()  # Lazy load
-        
-        with self._lock:
-            for i, movie in enumerate(self._movies):
-                if movie.id == id:
-                    del self._movies[i]
-                    
-                    # Skip CSV saving for deletions to improve performance
-                    # Changes are kept in memory only
-                    
-                    return True
-            return False
-    
-    def get_movie_by_id(self, id: int) -> Optional[Movie]:
-        """Get a movie by ID"""
-        self._ensure_loaded()  # Lazy load
-        
-        with self._lock:
-            for movie in self._movies:
-                if movie.id == id:
-                    return movie
-            return None
-
-    def create_user(self, parsed_info: ParsedUserInfo) -> int:
-        """Create a new user profile from parsed information"""
-        with self._lock:
-            user = UserProfile(
-                id=self._next_user_id,
-                first_name=parsed_info.first_name,
-                last_name=parsed_info.last_name,
-                phone_number=parsed_info.phone_number,
-                street_address=parsed_info.street_address,
-                apartment_number=parsed_info.apartment_number,
-                city=parsed_info.city,
-                state=parsed_info.state,
-                country=parsed_info.country,
-                zip_code=parsed_info.zip_code,
-                created_at=datetime.now().isoformat()
-            )
-            self._users.append(user)
-            self._next_user_id += 1
-            return user.id
-
-    def get_user_by_id(self, id: int) -> Optional[UserProfile]:
-        """Get a user by ID"""
-        with self._lock:
-            for user in self._users:
-                if user.id == id:
-                    return user
-            return None
-
-    def get_all_users(self) -> List[UserProfile]:
-        """Get all users"""
-        with self._lock:
-            return self._users.copy()
-
-    def delete_user(self, id: int) -> bool:
-        """Delete a user by ID"""
-        with self._lock:
-            for i, user in enumerate(self._users):
-                if user.id == id:
-                    del self._users[i]
-                    return True
-            return False
-
-
-# Initialize database instance
+from collections import Counter
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import List, Optional, Dict, Any
+from models import Movie, MovieFilters, CreateMovieCommand, UpdateMovieCommand, UserProfile, ParsedUserInfo
+import threading
+import mmap
+import numpy as np
+import pandas as pd
+import orjson
+import os
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pathlib import Path
+import math
+import re
+import time
+from datetime import datetime
+
+
+# Contiguous alphanumeric runs; the unit of the inverted search index.
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+@lru_cache(maxsize=256)
+def _token_match_pattern(search_term: str) -> "re.Pattern[str]":
+    """Compiled matcher for vocabulary tokens containing the (escaped) term.
+
+    Cached so repeated queries reuse the compiled program; MULTILINE ^.*term.*$
+    captures each whole matching token from the newline-joined vocabulary.
+    """
+    return re.compile("^.*" + re.escape(search_term) + ".*$", re.MULTILINE)
+
+
+# Seconds the background writer waits after a change before flushing, so
+# bursts of mutations coalesce into one CSV write.
+SAVE_COALESCE_SECONDS = 5.0
+
+
+def _dumps(value) -> str:
+    """Serialize a JSON column value with orjson (2-5x faster than stdlib)"""
+    return orjson.dumps(value).decode()
+
+
+# Movie fields holding lists of dicts; stored as JSON strings in the Parquet
+# catalogue cache.
+_JSON_FIELDS = (
+    "genres", "keywords", "cast", "crew",
+    "production_companies", "production_countries", "spoken_languages",
+)
+
+# Scalar movie fields carried through the Parquet catalogue cache verbatim.
+_SCALAR_FIELDS = (
+    "title", "overview", "tagline", "original_language", "original_title",
+    "release_date", "runtime", "vote_average", "vote_count", "popularity",
+)
+
+_EMPTY_POSITIONS = np.empty(0, dtype=np.int64)
+
+
+class _ReadWriteLock:
+    """Readers-writer lock: any number of concurrent readers, one writer.
+
+    The condition wraps a reentrant lock, so the movie catalogue's many
+    read-mostly endpoints no longer serialize on a single mutex; writers wait
+    for readers to drain and exclude each other.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.RLock())
+        self._readers = 0
+        self._writing = False
+
+    @contextmanager
+    def read_locked(self):
+        with self._cond:
+            while self._writing:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if self._readers == 0:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write_locked(self):
+        with self._cond:
+            while self._writing or self._readers:
+                self._cond.wait()
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writing = False
+                self._cond.notify_all()
+
+
+class MovieDatabase:
+    def __init__(self, csv_path: str = None):
+        self._movies: List[Movie] = []
+        self._users: List[UserProfile] = []
+        # id -> object indexes so lookups are O(1) instead of scanning the lists
+        self._movies_by_id: Dict[int, Movie] = {}
+        self._users_by_id: Dict[int, UserProfile] = {}
+        self._next_movie_id = 1
+        self._next_user_id = 1
+        self._lock = _ReadWriteLock()
+        # Serializes lazy rebuilds of the cached filter views, which can race
+        # between concurrent readers.
+        self._views_mutex = threading.Lock()
+        # Columnar view of the movie list used for vectorized filtering.
+        # Rebuilt lazily whenever the list or filterable fields change.
+        self._filter_frame: Optional[pd.DataFrame] = None
+        self._filter_frame_dirty = True
+        # Posting indexes for single-predicate queries, rebuilt with the frame
+        self._favorite_positions = _EMPTY_POSITIONS
+        self._language_positions: Dict[str, np.ndarray] = {}
+        # Inverted index: token -> set of movie ids containing it, plus the
+        # newline-joined vocabulary for regex scanning. Rebuilt lazily
+        # together with the filter frame.
+        self._token_index: Dict[str, set] = {}
+        self._vocab_blob = ""
+        self._token_index_dirty = True
+        # Monotonic counter bumped on every movie mutation; callers use it to
+        # key caches of derived data (stats, ETags).
+        self._data_version = 0
+        # Materialized aggregates behind /api/stats: built once on first read,
+        # then maintained incrementally by each write.
+        self._stats_dirty = True
+        self._genre_counts: Counter = Counter()
+        self._decade_counts: Counter = Counter()
+        self._favorites_count = 0
+        self._rated_count = 0
+        
+        # Auto-detect which dataset to use
+        if csv_path:
+            self.csv_path = Path(csv_path)
+        else:
+            # Check if full dataset exists and has been set up
+            full_dataset = Path("../Semantic_Recent.csv")
+            sample_dataset = Path("../sample_movies.csv")
+            
+            if full_dataset.exists() and self._is_full_dataset(full_dataset):
+                self.csv_path = full_dataset
+                print("🎉 Using full dataset with 4800+ movies!")
+            elif sample_dataset.exists():
+                self.csv_path = sample_dataset
+                print("📋 Using sample dataset. Run './setup-dataset.sh' to upgrade to full dataset.")
+            else:
+                self.csv_path = full_dataset  # Fallback
+                print("⚠️  No dataset found. Please run './setup-dataset.sh' to set up the movie database.")
+        
+        self._loaded = False
+        self._load_chunk_size = 200  # Process 200 rows at a time
+        
+        # CSV persistence runs on a background writer thread so request
+        # handlers only flip a dirty flag. Off by default (mutations used to
+        # skip saving entirely); opt in with MOVIES_PERSIST_CSV=1.
+        self._persist_enabled = os.getenv("MOVIES_PERSIST_CSV", "").lower() in ("1", "true", "yes")
+        self._save_pending = threading.Event()
+        if self._persist_enabled:
+            writer = threading.Thread(target=self._writer_loop, name="movie-csv-writer", daemon=True)
+            writer.start()
+        
+        # Lazy load - only load when first requested
+        print(f"MovieDatabase initialized. CSV will be loaded from {self.csv_path} on first request.")
+    
+    def _is_full_dataset(self, csv_path: Path) -> bool:
+        """Check if the CSV file contains the full dataset (1000+ movies)"""
+        try:
+            with open(csv_path, 'rb') as f:
+                # Count raw newlines via mmap (libc memchr) instead of
+                # decoding and iterating every line in Python.
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    line_count = mm.count(b"\n") - 1  # Subtract header
+                    return line_count >= 1000
+        except Exception:
+            return False
+    
+    def _ensure_loaded(self):
+        """Ensure CSV is loaded (lazy loading)"""
+        if self._loaded:
+            return
+            
+        with self._lock.write_locked():
+            if self._loaded:  # Double-check pattern
+                return
+                
+            try:
+                self._load_from_csv_chunked()
+                self._loaded = True
+            except Exception as e:
+                print(f"Error loading CSV: {e}")
+                self._movies = []
+                self._movies_by_id = {}
+                self._loaded = True  # Mark as loaded even if failed to prevent retries
+    
+    def preload(self):
+        """Eagerly run the lazy CSV load; intended for app startup.
+
+        Every read/write method loads on demand, but the first one to arrive
+        pays the full parse. Calling this from a background thread at startup
+        keeps that cost off the request path (and off the event loop).
+        """
+        self._ensure_loaded()
+
+    def reset(self):
+        """Rebind the store to an empty, loaded state.
+
+        Used by the tests for per-test isolation: rebinding the containers is
+        O(1) regardless of how many movies were created, and marking the store
+        loaded keeps the lazy CSV load from repopulating it mid-test.
+        """
+        with self._lock.write_locked():
+            self._movies = []
+            self._users = []
+            self._movies_by_id = {}
+            self._users_by_id = {}
+            self._next_movie_id = 1
+            self._next_user_id = 1
+            self._loaded = True
+            self._stats_dirty = True
+            self._mark_views_stale()
+
+    def _load_from_csv_chunked(self):
+        """Load movies from CSV file, preferring the multithreaded pyarrow engine"""
+        if not self.csv_path.exists():
+            print(f"CSV file not found at {self.csv_path}. Starting with empty database.")
+            return
+        
+        # A Parquet snapshot of the parsed catalogue skips CSV parsing and
+        # per-field cleanup entirely on warm starts.
+        if self._load_from_parquet():
+            return
+        
+        print(f"Loading movies from {self.csv_path}...")
+
+        # latin-1 decodes any byte sequence without error, so the old probe
+        # pass (re-parsing the first rows per candidate encoding) is wasted
+        # work; any remaining failures are structural and hit the fallback
+        # loader below.
+        encoding_used = 'latin-1'
+
+        self._movies = []
+        self._movies_by_id = {}
+        
+        # Fast path: pyarrow's CSV reader tokenizes with SIMD across threads
+        # and reads the whole file in one go, so no chunking is needed.
+        try:
+            df = pd.read_csv(self.csv_path, encoding=encoding_used, engine='pyarrow')
+        except Exception as e:
+            print(f"pyarrow CSV read failed ({e}); falling back to chunked loader")
+            self._load_csv_in_chunks(encoding_used)
+            return
+        
+        self._build_movies(df)
+        self._next_movie_id = len(self._movies) + 1
+        self._mark_views_stale()
+        print(f"✅ Successfully loaded {len(self._movies)} movies")
+        self._write_parquet_cache()
+    
+    @property
+    def parquet_path(self) -> Path:
+        """Location of the Parquet catalogue cache, next to the CSV"""
+        return self.csv_path.with_suffix('.parquet')
+    
+    def _load_from_parquet(self) -> bool:
+        """Load the catalogue from the Parquet cache if it is still fresh"""
+        try:
+            if not self.parquet_path.exists():
+                return False
+            if self.parquet_path.stat().st_mtime < self.csv_path.stat().st_mtime:
+                return False  # CSV has changed since the cache was written
+            
+            table = pq.read_table(self.parquet_path, memory_map=True)
+            columns = table.to_pydict()
+        except Exception as e:
+            print(f"Parquet cache read failed ({e}); loading CSV instead")
+            return False
+        
+        print(f"Loading movies from Parquet cache {self.parquet_path}...")
+        for movie_id in range(1, len(table) + 1):
+            i = movie_id - 1
+            try:
+                # The cache is our own serialized output, so skip validation
+                movie = Movie.model_construct(
+                    id=movie_id,
+                    **{field: columns[field][i] for field in _SCALAR_FIELDS},
+                    **{field: orjson.loads(columns[field][i]) for field in _JSON_FIELDS},
+                )
+            except Exception:
+                continue
+            self._movies.append(movie)
+            self._movies_by_id[movie.id] = movie
+        
+        self._next_movie_id = len(self._movies) + 1
+        self._mark_views_stale()
+        print(f"✅ Loaded {len(self._movies)} movies from Parquet cache")
+        return True
+    
+    def _write_parquet_cache(self):
+        """Snapshot the parsed catalogue to Parquet for fast cold starts"""
+        try:
+            data = {
+                field: [getattr(m, field) for m in self._movies]
+                for field in _SCALAR_FIELDS
+            }
+            for field in _JSON_FIELDS:
+                data[field] = [_dumps(getattr(m, field)) for m in self._movies]
+            pq.write_table(pa.table(data), self.parquet_path, compression='zstd')
+            print(f"Wrote Parquet cache to {self.parquet_path}")
+        except Exception as e:
+            print(f"Failed to write Parquet cache: {e}")
+    
+    def _build_movies(self, df: pd.DataFrame):
+        """Construct Movie objects in bulk from a loaded DataFrame"""
+        try:
+            movies = Movie.from_dataframe(df, start_id=len(self._movies) + 1)
+        except Exception:
+            # Vectorized path failed; fall back to row-at-a-time so one bad
+            # chunk doesn't lose the whole load
+            movies = []
+            for movie_id, row in enumerate(df.to_dict('records'), len(self._movies) + 1):
+                try:
+                    movies.append(Movie.from_csv_row(row, movie_id))
+                except Exception:
+                    # Silently skip problematic rows to prevent console spam
+                    continue
+        self._movies.extend(movies)
+        for movie in movies:
+            self._movies_by_id[movie.id] = movie
+    
+    def _load_csv_in_chunks(self, encoding_used: str):
+        """Fallback loader: read the CSV in chunks with the tolerant C engine"""
+        processed_count = 0
+        
+        try:
+            # Read CSV in chunks to prevent memory issues
+            chunk_reader = pd.read_csv(
+                self.csv_path,
+                encoding=encoding_used,
+                chunksize=self._load_chunk_size,
+                on_bad_lines='skip',
+                low_memory=False
+            )
+            
+            for chunk_num, chunk_df in enumerate(chunk_reader, 1):
+                print(f"Processing chunk {chunk_num} ({len(chunk_df)} rows)...")
+                
+                self._build_movies(chunk_df)
+                processed_count = len(self._movies)
+                
+                # Progress update every 5 chunks
+                if chunk_num % 5 == 0:
+                    print(f"  Processed {processed_count} movies so far...")
+            
+            self._next_movie_id = len(self._movies) + 1
+            self._mark_views_stale()
+            print(f"✅ Successfully loaded {len(self._movies)} movies")
+            self._write_parquet_cache()
+            
+        except Exception as e:
+            print(f"Error during chunked loading: {e}")
+            # Continue with whatever movies were loaded
+            self._next_movie_id = len(self._movies) + 1
+            self._mark_views_stale()
+    
+    def _schedule_save(self):
+        """Mark the catalogue dirty; the background writer picks it up"""
+        if self._persist_enabled:
+            self._save_pending.set()
+    
+    def _writer_loop(self):
+        """Background thread: flush dirty state to CSV, coalescing bursts"""
+        while True:
+            self._save_pending.wait()
+            time.sleep(SAVE_COALESCE_SECONDS)
+            self._save_pending.clear()
+            self._save_to_csv()
+    
+    def _save_to_csv(self):
+        """Save current movies back to CSV file"""
+        try:
+            with self._lock.read_locked():
+                # Convert movies to DataFrame format under the lock...
+                data = []
+                for movie in self._movies:
+                    row = {
+                        "title_y": movie.title,
+                        "overview": movie.overview,
+                        "genres": _dumps(movie.genres) if movie.genres else "",
+                        "keywords": _dumps(movie.keywords) if movie.keywords else "",
+                        "tagline": movie.tagline,
+                        "cast": _dumps(movie.cast) if movie.cast else "",
+                        "crew": _dumps(movie.crew) if movie.crew else "",
+                        "production_companies": _dumps(movie.production_companies) if movie.production_companies else "",
+                        "production_countries": _dumps(movie.production_countries) if movie.production_countries else "",
+                        "spoken_languages": _dumps(movie.spoken_languages) if movie.spoken_languages else "",
+                        "original_language": movie.original_language,
+                        "original_title": movie.original_title,
+                        "release_date": movie.release_date,
+                        "runtime": movie.runtime,
+                        "vote_average": movie.vote_average,
+                        "vote_count": movie.vote_count,
+                        "popularity": movie.popularity
+                    }
+                    data.append(row)
+            
+            # ...but serialize and write with the lock released so readers
+            # are not blocked for the duration of the pandas write.
+            df = pd.DataFrame(data)
+            df.to_csv(self.csv_path, index=False)
+            print(f"Saved {len(data)} movies to CSV")
+        
+        except Exception as e:
+            print(f"Error saving to CSV: {e}")
+    
+    def get_movies_paginated(self, page: int = 1, size: int = 20, filters: Optional[MovieFilters] = None) -> tuple[List[Movie], int]:
+        """Get paginated movies with optional filtering.
+
+        Pagination happens here, not in the caller: the filter pass yields
+        matching indices plus a count (the LIMIT/OFFSET + COUNT(*) split of a
+        SQL backend) and only the requested page window is materialized.
+        """
+        self._ensure_loaded()  # Lazy load
+
+        with self._lock.read_locked():
+            # Calculate pagination
+            start_idx = (page - 1) * size
+            end_idx = start_idx + size
+
+            if not filters or not self._movies:
+                # Slicing allocates only the page window, never the full list
+                return self._movies[start_idx:end_idx], len(self._movies)
+
+            indices = self._apply_filter_indices(filters)
+            total = len(indices)
+            if start_idx >= total:
+                return [], total
+            return [self._movies[i] for i in indices[start_idx:end_idx]], total
+    
+    def _ensure_stats(self):
+        """Build the materialized aggregates; must hold at least a read lock"""
+        if not self._stats_dirty:
+            return
+        with self._views_mutex:
+            if not self._stats_dirty:
+                return
+            genre_counts: Counter = Counter()
+            decade_counts: Counter = Counter()
+            favorites = rated = 0
+            for movie in self._movies:
+                for genre in movie.genres:
+                    genre_counts[genre.get("name", "Unknown")] += 1
+                if movie.year is not None:
+                    decade_counts[(movie.year // 10) * 10] += 1
+                favorites += movie.is_favorite
+                rated += movie.personal_rating is not None
+            self._genre_counts = genre_counts
+            self._decade_counts = decade_counts
+            self._favorites_count = favorites
+            self._rated_count = rated
+            self._stats_dirty = False
+
+    def _stats_apply(self, movie: Movie, sign: int):
+        """Fold one created (+1) or deleted (-1) movie into the aggregates"""
+        if self._stats_dirty:
+            return  # full build pending; nothing to maintain yet
+        for genre in movie.genres:
+            name = genre.get("name", "Unknown")
+            self._genre_counts[name] += sign
+            if self._genre_counts[name] <= 0:
+                del self._genre_counts[name]
+        if movie.year is not None:
+            decade = (movie.year // 10) * 10
+            self._decade_counts[decade] += sign
+            if self._decade_counts[decade] <= 0:
+                del self._decade_counts[decade]
+        if movie.is_favorite:
+            self._favorites_count += sign
+        if movie.personal_rating is not None:
+            self._rated_count += sign
+
+    def count_movies(self) -> int:
+        """Total number of movies"""
+        self._ensure_loaded()
+        with self._lock.read_locked():
+            return len(self._movies)
+
+    def count_favorites(self) -> int:
+        """Number of movies flagged as favorites"""
+        self._ensure_loaded()
+        with self._lock.read_locked():
+            self._ensure_stats()
+            return self._favorites_count
+
+    def count_rated(self) -> int:
+        """Number of movies with a personal rating"""
+        self._ensure_loaded()
+        with self._lock.read_locked():
+            self._ensure_stats()
+            return self._rated_count
+
+    def get_genre_counts(self, limit: int = 10) -> List[tuple]:
+        """Top genres as (name, count) pairs, most frequent first"""
+        self._ensure_loaded()
+        with self._lock.read_locked():
+            self._ensure_stats()
+            return self._genre_counts.most_common(limit)
+
+    def get_decade_counts(self) -> List[tuple]:
+        """Release-decade histogram as sorted (decade, count) pairs"""
+        self._ensure_loaded()
+        with self._lock.read_locked():
+            self._ensure_stats()
+            return sorted(self._decade_counts.items())
+
+    def _mark_views_stale(self):
+        """Flag the filter frame and token index for lazy rebuild"""
+        self._filter_frame_dirty = True
+        self._token_index_dirty = True
+        self._data_version += 1
+
+    def data_version(self) -> int:
+        """Current movie-mutation version; changes whenever movie data does"""
+        self._ensure_loaded()
+        return self._data_version
+    
+    def _get_filter_frame(self) -> pd.DataFrame:
+        """Return the columnar filter view, rebuilding it if stale.
+        
+        Must be called with the lock held. String columns are pre-lowercased
+        and the release year pre-parsed so filters never touch per-movie
+        Python objects.
+        """
+        if not self._filter_frame_dirty and self._filter_frame is not None:
+            return self._filter_frame
+        
+        with self._views_mutex:
+            if not self._filter_frame_dirty and self._filter_frame is not None:
+                return self._filter_frame
+            return self._build_filter_frame()
+    
+    def _build_filter_frame(self) -> pd.DataFrame:
+        movies = self._movies
+        self._filter_frame = pd.DataFrame({
+            "id": np.array([m.id for m in movies], dtype=np.int64),
+            "title_lc": [m.title_lc for m in movies],
+            "overview_lc": [m.overview_lc for m in movies],
+            "names_lc": [
+                "\n".join(
+                    person.get("name", "").lower()
+                    for person in (*m.cast, *m.crew)
+                )
+                for m in movies
+            ],
+            "genres_lc": [
+                frozenset(genre.get("name", "").lower() for genre in m.genres)
+                for m in movies
+            ],
+            "year": np.array([np.nan if m.year is None else m.year for m in movies], dtype=np.float64),
+            "vote_average": np.array([m.vote_average or np.nan for m in movies], dtype=np.float64),
+            "runtime": np.array([m.runtime or np.nan for m in movies], dtype=np.float64),
+            "language": [m.original_language for m in movies],
+            "is_favorite": np.array([m.is_favorite for m in movies], dtype=bool),
+            "personal_rating": np.array([m.personal_rating or np.nan for m in movies], dtype=np.float64),
+        })
+        # Posting "indexes" for the predicates that often arrive alone
+        # (favorites page, language filter): position arrays precomputed here
+        # so those queries skip the full mask pass.
+        self._favorite_positions = np.flatnonzero(self._filter_frame["is_favorite"].to_numpy())
+        self._language_positions = dict(self._filter_frame.groupby("language").indices)
+        self._filter_frame_dirty = False
+        return self._filter_frame
+    
+    def _get_token_index(self) -> Dict[str, set]:
+        """Return the inverted search index, rebuilding it if stale.
+        
+        Must be called with the lock held. Maps each lowercase token found in
+        a movie's title, overview, or cast/crew names to the set of movie ids
+        containing it.
+        """
+        if not self._token_index_dirty:
+            return self._token_index
+        
+        with self._views_mutex:
+            if not self._token_index_dirty:
+                return self._token_index
+            return self._build_token_index()
+    
+    def _build_token_index(self) -> Dict[str, set]:
+        index: Dict[str, set] = {}
+        for movie in self._movies:
+            parts = [movie.title or "", movie.overview or ""]
+            parts.extend(person.get("name", "") for person in (*movie.cast, *movie.crew))
+            for token in _TOKEN_RE.findall(" ".join(parts).lower()):
+                ids = index.get(token)
+                if ids is None:
+                    index[token] = {movie.id}
+                else:
+                    ids.add(movie.id)
+        
+        self._token_index = index
+        self._vocab_blob = "\n".join(index)
+        self._token_index_dirty = False
+        return index
+    
+    def _search_ids(self, search_term: str) -> set:
+        """Resolve a single-token search term against the inverted index.
+        
+        Matching tokens are found with one compiled-regex pass over the
+        newline-joined vocabulary instead of a Python-level loop over every
+        token, while keeping the original substring semantics.
+        """
+        index = self._get_token_index()
+        matched: set = set()
+        for token in _token_match_pattern(search_term).findall(self._vocab_blob):
+            matched |= index[token]
+        return matched
+    
+    def _apply_filter_indices(self, filters: MovieFilters) -> np.ndarray:
+        """Resolve filters to matching list positions via vectorized masks.
+        
+        Must be called with the lock held and with at least one movie loaded.
+        Returning positions instead of a filtered list keeps per-request
+        allocation proportional to the page size.
+        """
+        df = self._get_filter_frame()
+
+        # Single-predicate fast paths: the favorites page and plain language
+        # filters resolve from prebuilt posting indexes, skipping the mask pass
+        active = [name for name in MovieFilters.model_fields if getattr(filters, name) is not None]
+        if active == ["is_favorite"] and filters.is_favorite:
+            return self._favorite_positions
+        if active == ["language"] and filters.language:
+            return self._language_positions.get(filters.language, _EMPTY_POSITIONS)
+
+        mask = np.ones(len(df), dtype=bool)
+
+        # Search filter
+        if filters.search:
+            search_term = filters.search.lower()
+            # Single-token terms resolve through the inverted index; terms
+            # with separators (which can span token boundaries) or very short
+            # ones fall back to the vectorized substring scan.
+            if len(search_term) >= 3 and _TOKEN_RE.fullmatch(search_term):
+                mask &= df["id"].isin(self._search_ids(search_term)).to_numpy()
+            else:
+                mask &= (
+                    df["title_lc"].str.contains(search_term, regex=False)
+                    | df["overview_lc"].str.contains(search_term, regex=False)
+                    | df["names_lc"].str.contains(search_term, regex=False)
+                ).to_numpy()
+        
+        # Genre filter
+        if filters.genres:
+            wanted = frozenset(g.lower() for g in filters.genres)
+            mask &= df["genres_lc"].map(lambda names: not wanted.isdisjoint(names)).to_numpy()
+        
+        # Year filters (movies without a parseable year never match)
+        if filters.year_from or filters.year_to:
+            year = df["year"].to_numpy()
+            year_mask = ~np.isnan(year)
+            if filters.year_from:
+                year_mask &= year >= filters.year_from
+            if filters.year_to:
+                year_mask &= year <= filters.year_to
+            mask &= year_mask
+        
+        # Rating filters (zero/missing ratings never match, as before)
+        rating = df["vote_average"].to_numpy()
+        if filters.rating_from is not None:
+            mask &= (rating > 0) & (rating >= filters.rating_from)
+        
+        if filters.rating_to is not None:
+            mask &= (rating > 0) & (rating <= filters.rating_to)
+        
+        # Runtime filters
+        runtime = df["runtime"].to_numpy()
+        if filters.runtime_from is not None:
+            mask &= (runtime > 0) & (runtime >= filters.runtime_from)
+        
+        if filters.runtime_to is not None:
+            mask &= (runtime > 0) & (runtime <= filters.runtime_to)
+        
+        # Language filter
+        if filters.language:
+            mask &= (df["language"] == filters.language).to_numpy()
+        
+        # Favorite filter
+        if filters.is_favorite is not None:
+            mask &= df["is_favorite"].to_numpy() == filters.is_favorite
+        
+        # Personal rating filters
+        personal = df["personal_rating"].to_numpy()
+        if filters.personal_rating_from is not None:
+            mask &= (personal > 0) & (personal >= filters.personal_rating_from)
+        
+        if filters.personal_rating_to is not None:
+            mask &= (personal > 0) & (personal <= filters.personal_rating_to)
+        
+        return np.flatnonzero(mask)
+    
+    def create_movie(self, command: CreateMovieCommand) -> int:
+        """Create a new movie"""
+        self._ensure_loaded()  # Lazy load
+        
+        with self._lock.write_locked():
+            movie = Movie(
+                id=self._next_movie_id,
+                title=command.title,
+                overview=command.overview,
+                genres=command.genres,
+                keywords=command.keywords,
+                tagline=command.tagline,
+                cast=command.cast,
+                crew=command.crew,
+                production_companies=command.production_companies,
+                production_countries=command.production_countries,
+                spoken_languages=command.spoken_languages,
+                original_language=command.original_language,
+                original_title=command.original_title,
+                release_date=command.release_date,
+                runtime=command.runtime,
+                vote_average=command.vote_average,
+                vote_count=command.vote_count,
+                popularity=command.popularity,
+                is_favorite=False,
+                personal_rating=None,
+                personal_notes=None
+            )
+            self._movies.append(movie)
+            self._movies_by_id[movie.id] = movie
+            self._next_movie_id += 1
+            self._stats_apply(movie, +1)
+            self._mark_views_stale()
+            self._schedule_save()
+
+            return movie.id
+    
+    def bulk_insert(self, rows: List[dict], skip_validation: bool = False) -> List[int]:
+        """Insert many movies in one locked pass and return their ids.
+
+        Each dict holds Movie field values; missing fields fall back to the
+        model defaults. Taking the write lock and invalidating the cached
+        views once for the whole batch makes this far cheaper than calling
+        create_movie per row, which matters for tests and imports.
+
+        skip_validation builds rows with model_construct, bypassing pydantic
+        field validation; only safe for trusted rows whose values already
+        have the right types (e.g. literal test fixtures).
+        """
+        self._ensure_loaded()
+
+        with self._lock.write_locked():
+            start_id = self._next_movie_id
+            build = Movie.model_construct if skip_validation else Movie
+            movies = [build(id=movie_id, **row)
+                      for movie_id, row in enumerate(rows, start_id)]
+            self._movies.extend(movies)
+            self._movies_by_id.update((movie.id, movie) for movie in movies)
+            self._next_movie_id = start_id + len(movies)
+            # One full rebuild on next stats read beats per-row increments
+            self._stats_dirty = True
+            self._mark_views_stale()
+            self._schedule_save()
+
+            return [movie.id for movie in movies]
+
+    def update_movie(self, id: int, command: UpdateMovieCommand) -> bool:
+        """Update an existing movie"""
+        self._ensure_loaded()  # Lazy load
+        
+        with self._lock.write_locked():
+            movie = self._movies_by_id.get(id)
+            if movie is None:
+                return False
+            
+            was_favorite = movie.is_favorite
+            was_rated = movie.personal_rating is not None
+
+            if command.title is not None:
+                movie.title = command.title
+            if command.overview is not None:
+                movie.overview = command.overview
+            if command.is_favorite is not None:
+                movie.is_favorite = command.is_favorite
+            if command.personal_rating is not None:
+                movie.personal_rating = command.personal_rating
+            if command.personal_notes is not None:
+                movie.personal_notes = command.personal_notes
+
+            movie.refresh_derived()
+            if not self._stats_dirty:
+                self._favorites_count += movie.is_favorite - was_favorite
+                self._rated_count += (movie.personal_rating is not None) - was_rated
+            self._mark_views_stale()
+            self._schedule_save()
+            
+            return True
+    
+    def toggle_favorite(self, id: int) -> Optional[bool]:
+        """Flip a movie's favorite flag in one locked operation.
+
+        Returns the new flag value, or None when the movie doesn't exist, so
+        the endpoint needs neither a prior read nor a full update command.
+        """
+        self._ensure_loaded()  # Lazy load
+
+        with self._lock.write_locked():
+            movie = self._movies_by_id.get(id)
+            if movie is None:
+                return None
+
+            movie.is_favorite = not movie.is_favorite
+            if not self._stats_dirty:
+                self._favorites_count += 1 if movie.is_favorite else -1
+            self._mark_views_stale()
+            self._schedule_save()
+
+            return movie.is_favorite
+
+    def delete_movie(self, id: int) -> bool:
+        """Delete a movie"""
+        self._ensure_loaded()  # Lazy load
+        
+        with self._lock.write_locked():
+            movie = self._movies_by_id.pop(id, None)
+            if movie is None:
+                return False
+            
+            self._movies.remove(movie)
+            self._stats_apply(movie, -1)
+            self._mark_views_stale()
+            self._schedule_save()
+            
+            return True
+    
+    def get_movie_by_id(self, id: int) -> Optional[Movie]:
+        """Get a movie by ID"""
+        self._ensure_loaded()  # Lazy load
+        
+        with self._lock.read_locked():
+            return self._movies_by_id.get(id)
+
+    def create_user(self, parsed_info: ParsedUserInfo) -> int:
+        """Create a new user profile from parsed information"""
+        with self._lock.write_locked():
+            user = UserProfile(
+                id=self._next_user_id,
+                first_name=parsed_info.first_name,
+                last_name=parsed_info.last_name,
+                phone_number=parsed_info.phone_number,
+                street_address=parsed_info.street_address,
+                apartment_number=parsed_info.apartment_number,
+                city=parsed_info.city,
+                state=parsed_info.state,
+                country=parsed_info.country,
+                zip_code=parsed_info.zip_code,
+                created_at=datetime.now().isoformat()
+            )
+            self._users.append(user)
+            self._users_by_id[user.id] = user
+            self._next_user_id += 1
+            return user.id
+
+    def get_user_by_id(self, id: int) -> Optional[UserProfile]:
+        """Get a user by ID"""
+        with self._lock.read_locked():
+            return self._users_by_id.get(id)
+
+    def get_all_users(self) -> List[UserProfile]:
+        """Get all users"""
+        with self._lock.read_locked():
+            return self._users.copy()
+
+    def delete_user(self, id: int) -> bool:
+        """Delete a user by ID"""
+        with self._lock.write_locked():
+            user = self._users_by_id.pop(id, None)
+            if user is None:
+                return False
+            
+            self._users.remove(user)
+            return True
+
+
+# Initialize database instance
 db = MovieDatabase()
\ No newline at end of file
@@ -1,164 +1,278 @@
-from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
-from datetime import date
-import json
-
-
-class Movie(BaseModel):
-    id: int
-    title: str = Field(..., description="Movie title")
-    overview: Optional[str] = Field(None, description="Movie overview/plot")
-    genres: List[Dict[str, Any]] = Field(default_factory=list, description="List of genre objects")
-    keywords: List[Dict[str, Any]] = Field(default_factory=list, description="List of keyword objects")
-    tagline: Optional[str] = Field(None, description="Movie tagline")
-    cast: List[Dict[str, Any]] = Field(default_factory=list, description="List of cast members")
-    crew: List[Dict[str, Any]] = Field(default_factory=list, description="List of crew members")
-    production_companies: List[Dict[str, Any]] = Field(default_factory=list, description="Production companies")
-    production_countries: List[Dict[str, Any]] = Field(default_factory=list, description="Production countries")
-    spoken_languages: List[Dict[str, Any]] = Field(default_factory=list, description="Spoken languages")
-    original_language: Optional[str] = Field(None, description="Original language code")
-    original_title: Optional[str] = Field(None, description="Original title")
-    release_date: Optional[str] = Field(None, description="Release date")
-    runtime: Optional[float] = Field(None, description="Runtime in minutes")
-    vote_average: Optional[float] = Field(None, description="Average vote score")
-    vote_count: Optional[int] = Field(None, description="Number of votes")
-    popularity: Optional[float] = Field(None, description="Popularity score")
-    is_favorite: bool = Field(False, description="User favorite flag")
-    personal_rating: Optional[float] = Field(None, description="Personal rating (1-10)")
-    personal_notes: Optional[str] = Field(None, description="Personal notes")
-
-    @classmethod
-    def from_csv_row(cls, row_data: Dict[str, Any], movie_id: int) -> "Movie":
-        """Create Movie instance from CSV row data"""
-        import pandas as pd
-        
-        def safe_string(value: Any) -> Optional[str]:
-            """Safely convert value to string, handling NaN"""
-            if pd.isna(value) or value is None:
-                return None
-            return str(value) if value != "" else None
-        
-        def safe_json_parse(value: Any) -> List[Dict[str, Any]]:
-            """Safely parse JSON string, return empty list if invalid"""
-            if pd.isna(value) or not value or str(value).strip() == "":
-                return []
-            try:
-                # Handle malformed JSON with double quotes
-                cleaned = str(value).replace('""', '"')
-                return json.loads(cleaned)
-            except (json.JSONDecodeError, TypeError, AttributeError):
-                return []
-        
-        def safe_number(value: Any, num_type=float) -> Optional[float]:
-            """Safely convert to number, handling NaN and invalid values"""
-            if pd.isna(value) or value is None:
-                return None
-            try:
-                return num_type(value)
-            except (ValueError, TypeError):
-                return None
-        
-        return cls(
-            id=movie_id,
-            title=safe_string(row_data.get("title_y")) or "Untitled",
-            overview=safe_string(row_data.get("overview")),
-            genres=safe_json_parse(row_data.get("genres", "")),
-            keywords=safe_json_parse(row_data.get("keywords", "")),
-            tagline=safe_string(row_data.get("tagline")),
-            cast=safe_json_parse(row_data.get("cast", "")),
-            crew=safe_json_parse(row_data.get("crew", "")),
-            production_companies=safe_json_parse(row_data.get("production_companies", "")),
-            production_countries=safe_json_parse(row_data.get("production_countries", "")),
-            spoken_languages=safe_json_parse(row_data.get("spoken_languages", "")),
-            original_language=safe_string(row_data.get("original_language")),
-            original_title=safe_string(row_data.get("original_title")),
-            release_date=safe_string(row_data.get("release_date")),
-            runtime=safe_number(row_data.get("runtime"), float),
-            vote_average=safe_number(row_data.get("vote_average"), float),
-            vote_count=safe_number(row_data.get("vote_count"), int),
-            popularity=safe_number(row_data.get("popularity"), float),
-            is_favorite=False,
-            personal_rating=None,
-            personal_notes=None
-        )
-
-
-class CreateMovieCommand(BaseModel):
-    title: str = Field(..., description="Movie title")
-    overview: Optional[str] = None
-    genres: List[Dict[str, Any]] = Field(default_factory=list)
-    keywords: List[Dict[str, Any]] = Field(default_factory=list)
-    tagline: Optional[str] = None
-    cast: List[Dict[str, Any]] = Field(default_factory=list)
-    crew: List[Dict[str, Any]] = Field(default_factory=list)
-    production_companies: List[Dict[str, Any]] = Field(default_factory=list)
-    production_countries: List[Dict[str, Any]] = Field(default_factory=list)
-    spoken_languages: List[Dict[str, Any]] = Field(default_factory=list)
-    original_language: Optional[str] = None
-    original_title: Optional[str] = None
-    release_date: Optional[str] = None
-    runtime: Optional[float] = None
-    vote_average: Optional[float] = None
-    vote_count: Optional[int] = None
-    popularity: Optional[float] = None
-
-
-class UpdateMovieCommand(BaseModel):
-    title: Optional[str] = None
-    overview: Optional[str] = None
-    is_favorite: Optional[bool] = None
-    personal_rating: Optional[float] = Field(None, ge=1, le=10, description="Personal rating (1-10)")
-    personal_notes: Optional[str] = None
-
-
-class MovieFilters(BaseModel):
-    search: Optional[str] = Field(None, description="Search in title, overview, cast, crew")
-    genres: Optional[List[str]] = Field(None, description="Filter by genre names")
-    year_from: Optional[int] = Field(None, description="Minimum release year")
-    year_to: Optional[int] = Field(None, description="Maximum release year")
-    rating_from: Optional[float] = Field(None, description="Minimum vote average")
-    rating_to: Optional[float] = Field(None, description="Maximum vote average")
-    runtime_from: Optional[int] = Field(None, description="Minimum runtime")
-    runtime_to: Optional[int] = Field(None, description="Maximum runtime")
-    language: Optional[str] = Field(None, description="Original language")
-    is_favorite: Optional[bool] = Field(None, description="Filter favorites")
-    personal_rating_from: Optional[float] = Field(None, description="Minimum personal rating")
-    personal_rating_to: Optional[float] = Field(None, description="Maximum personal rating")
-
-
-class PaginatedMovieResponse(BaseModel):
-    items: List[Movie]
-    total: int
-    page: int
-    size: int
-    pages: int
-
-
-class SignUpRequest(BaseModel):
-    user_input: str = Field(..., description="Single sentence containing all user information (name, phone, address)")
-
-
-class ParsedUserInfo(BaseModel):
-    first_name: str = Field(..., description="First name")
-    last_name: str = Field(..., description="Last name")
-    phone_number: str = Field(..., description="Phone number")
-    street_address: str = Field(..., description="Street address including number")
-    apartment_number: Optional[str] = Field(None, description="Apartment/unit number")
-    city: str = Field(..., description="City")
-    state: str = Field(..., description="State/Province")
-    country: str = Field(..., description="Country")
-    zip_code: str = Field(..., description="ZIP/Postal code")
-
-
-class UserProfile(BaseModel):
-    id: int
-    first_name: str
-    last_name: str
-    phone_number: str
-    street_address: str
-    apartment_number: Optional[str] = None
-    city: str
-    state: str
-    country: str
-    zip_code: str
+from pydantic import BaseModel, Field, PrivateAttr, field_validator
+from typing import Optional, List, Dict, Any
+from datetime import date
+import orjson
+
+# CSV columns holding embedded JSON arrays, and plain-text columns, as they
+# map onto Movie fields during bulk load.
+_JSON_COLUMNS = ("genres", "keywords", "cast", "crew", "production_companies",
+                 "production_countries", "spoken_languages")
+_STRING_COLUMNS = ("overview", "tagline", "original_language", "original_title",
+                   "release_date")
+
+
+class Movie(BaseModel):
+    id: int
+    title: str = Field(..., description="Movie title")
+    overview: Optional[str] = Field(None, description="Movie overview/plot")
+    genres: List[Dict[str, Any]] = Field(default_factory=list, description="List of genre objects")
+    keywords: List[Dict[str, Any]] = Field(default_factory=list, description="List of keyword objects")
+    tagline: Optional[str] = Field(None, description="Movie tagline")
+    cast: List[Dict[str, Any]] = Field(default_factory=list, description="List of cast members")
+    crew: List[Dict[str, Any]] = Field(default_factory=list, description="List of crew members")
+    production_companies: List[Dict[str, Any]] = Field(default_factory=list, description="Production companies")
+    production_countries: List[Dict[str, Any]] = Field(default_factory=list, description="Production countries")
+    spoken_languages: List[Dict[str, Any]] = Field(default_factory=list, description="Spoken languages")
+    original_language: Optional[str] = Field(None, description="Original language code")
+    original_title: Optional[str] = Field(None, description="Original title")
+    release_date: Optional[str] = Field(None, description="Release date")
+    runtime: Optional[float] = Field(None, description="Runtime in minutes")
+    vote_average: Optional[float] = Field(None, description="Average vote score")
+    vote_count: Optional[int] = Field(None, description="Number of votes")
+    popularity: Optional[float] = Field(None, description="Popularity score")
+    is_favorite: bool = Field(False, description="User favorite flag")
+    personal_rating: Optional[float] = Field(None, description="Personal rating (1-10)")
+    personal_notes: Optional[str] = Field(None, description="Personal notes")
+
+    # Derived values cached once per load so filtering never re-lowercases
+    # strings or re-parses the release date.
+    _title_lc: str = PrivateAttr("")
+    _overview_lc: str = PrivateAttr("")
+    _year: Optional[int] = PrivateAttr(None)
+
+    def model_post_init(self, __context) -> None:
+        self.refresh_derived()
+
+    def refresh_derived(self) -> None:
+        """Recompute the cached lowercase/year fields after a text mutation"""
+        self._title_lc = (self.title or "").lower()
+        self._overview_lc = (self.overview or "").lower()
+        year = None
+        if self.release_date:
+            try:
+                year = int(self.release_date.split("-")[0])
+            except (ValueError, IndexError):
+                year = None
+        self._year = year
+
+    @property
+    def title_lc(self) -> str:
+        return self._title_lc
+
+    @property
+    def overview_lc(self) -> str:
+        return self._overview_lc
+
+    @property
+    def year(self) -> Optional[int]:
+        return self._year
+
+    @classmethod
+    def from_dataframe(cls, df: "pd.DataFrame", start_id: int = 1) -> List["Movie"]:
+        """Build Movie objects for every row of a raw CSV DataFrame.
+
+        Column-wise pandas passes replace the per-row pd.isna checks and
+        stdlib JSON parses of from_csv_row; rows are then assembled with
+        model_construct since CSV ingest is trusted data. Matches
+        from_csv_row's semantics column for column.
+        """
+        import pandas as pd
+
+        def column(name):
+            if name in df.columns:
+                return df[name]
+            return pd.Series([None] * len(df), index=df.index, dtype=object)
+
+        def parse_json_cell(value):
+            try:
+                # Handle malformed JSON with double quotes; the membership
+                # check skips the copy for the clean majority of cells
+                if '""' in value:
+                    value = value.replace('""', '"')
+                return orjson.loads(value)
+            except (orjson.JSONDecodeError, TypeError, AttributeError):
+                return []
+
+        def clean_string(series):
+            cleaned = series.where(series.notna() & (series != ""), None)
+            # CSV columns are normally read as str already; only stringify strays
+            return [v if v is None or type(v) is str else str(v) for v in cleaned]
+
+        def clean_number(series, num_type):
+            numeric = pd.to_numeric(series, errors="coerce")
+            return [None if v != v else num_type(v) for v in numeric]
+
+        columns = {
+            "title": [v or "Untitled" for v in clean_string(column("title_y"))],
+            "runtime": clean_number(column("runtime"), float),
+            "vote_average": clean_number(column("vote_average"), float),
+            "vote_count": clean_number(column("vote_count"), int),
+            "popularity": clean_number(column("popularity"), float),
+        }
+        for name in _JSON_COLUMNS:
+            columns[name] = column(name).fillna("[]").map(parse_json_cell)
+        for name in _STRING_COLUMNS:
+            columns[name] = clean_string(column(name))
+
+        return [
+            cls.model_construct(
+                id=movie_id,
+                is_favorite=False,
+                personal_rating=None,
+                personal_notes=None,
+                **dict(zip(columns, values)),
+            )
+            for movie_id, values in enumerate(zip(*columns.values()), start_id)
+        ]
+
+    @classmethod
+    def from_csv_row(cls, row_data: Dict[str, Any], movie_id: int) -> "Movie":
+        """Create Movie instance from CSV row data"""
+        import pandas as pd
+        
+        def safe_string(value: Any) -> Optional[str]:
+            """Safely convert value to string, handling NaN"""
+            if pd.isna(value) or value is None:
+                return None
+            return str(value) if value != "" else None
+        
+        def safe_json_parse(value: Any) -> List[Dict[str, Any]]:
+            """Safely parse JSON string, return empty list if invalid"""
+            if pd.isna(value) or not value or str(value).strip() == "":
+                return []
+            try:
+                # Handle malformed JSON with double quotes; only copy the
+                # string when a fixup is actually needed
+                cleaned = str(value)
+                if '""' in cleaned:
+                    cleaned = cleaned.replace('""', '"')
+                return orjson.loads(cleaned)
+            except (orjson.JSONDecodeError, TypeError, AttributeError):
+                return []
+        
+        def safe_number(value: Any, num_type=float) -> Optional[float]:
+            """Safely convert to number, handling NaN and invalid values"""
+            if pd.isna(value) or value is None:
+                return None
+            try:
+                return num_type(value)
+            except (ValueError, TypeError):
+                return None
+        
+        return cls(
+            id=movie_id,
+            title=safe_string(row_data.get("title_y")) or "Untitled",
+            overview=safe_string(row_data.get("overview")),
+            genres=safe_json_parse(row_data.get("genres", "")),
+            keywords=safe_json_parse(row_data.get("keywords", "")),
+            tagline=safe_string(row_data.get("tagline")),
+            cast=safe_json_parse(row_data.get("cast", "")),
+            crew=safe_json_parse(row_data.get("crew", "")),
+            production_companies=safe_json_parse(row_data.get("production_companies", "")),
+            production_countries=safe_json_parse(row_data.get("production_countries", "")),
+            spoken_languages=safe_json_parse(row_data.get("spoken_languages", "")),
+            original_language=safe_string(row_data.get("original_language")),
+            original_title=safe_string(row_data.get("original_title")),
+            release_date=safe_string(row_data.get("release_date")),
+            runtime=safe_number(row_data.get("runtime"), float),
+            vote_average=safe_number(row_data.get("vote_average"), float),
+            vote_count=safe_number(row_data.get("vote_count"), int),
+            popularity=safe_number(row_data.get("popularity"), float),
+            is_favorite=False,
+            personal_rating=None,
+            personal_notes=None
+        )
+
+
+class CreateMovieCommand(BaseModel):
+    title: str = Field(..., description="Movie title")
+    overview: Optional[str] = None
+    genres: List[Dict[str, Any]] = Field(default_factory=list)
+    keywords: List[Dict[str, Any]] = Field(default_factory=list)
+    tagline: Optional[str] = None
+    cast: List[Dict[str, Any]] = Field(default_factory=list)
+    crew: List[Dict[str, Any]] = Field(default_factory=list)
+    production_companies: List[Dict[str, Any]] = Field(default_factory=list)
+    production_countries: List[Dict[str, Any]] = Field(default_factory=list)
+    spoken_languages: List[Dict[str, Any]] = Field(default_factory=list)
+    original_language: Optional[str] = None
+    original_title: Optional[str] = None
+    release_date: Optional[str] = None
+    runtime: Optional[float] = None
+    vote_average: Optional[float] = None
+    vote_count: Optional[int] = None
+    popularity: Optional[float] = None
+
+
+class UpdateMovieCommand(BaseModel):
+    title: Optional[str] = None
+    overview: Optional[str] = None
+    is_favorite: Optional[bool] = None
+    personal_rating: Optional[float] = Field(None, ge=1, le=10, description="Personal rating (1-10)")
+    personal_notes: Optional[str] = None
+
+
+class MovieFilters(BaseModel):
+    search: Optional[str] = Field(None, description="Search in title, overview, cast, crew")
+    genres: Optional[List[str]] = Field(None, description="Filter by genre names")
+    year_from: Optional[int] = Field(None, description="Minimum release year")
+    year_to: Optional[int] = Field(None, description="Maximum release year")
+    rating_from: Optional[float] = Field(None, description="Minimum vote average")
+    rating_to: Optional[float] = Field(None, description="Maximum vote average")
+    runtime_from: Optional[int] = Field(None, description="Minimum runtime")
+    runtime_to: Optional[int] = Field(None, description="Maximum runtime")
+    language: Optional[str] = Field(None, description="Original language")
+    is_favorite: Optional[bool] = Field(None, description="Filter favorites")
+    personal_rating_from: Optional[float] = Field(None, description="Minimum personal rating")
+    personal_rating_to: Optional[float] = Field(None, description="Maximum personal rating")
+
+
+class PaginatedMovieResponse(BaseModel):
+    items: List[Movie]
+    total: int
+    page: int
+    size: int
+    pages: int
+
+
+class SignUpRequest(BaseModel):
+    user_input: str = Field(..., description="Single sentence containing all user information (name, phone, address)")
+
+
+class ParsedUserInfo(BaseModel):
+    first_name: str = Field("Unknown", description="First name")
+    last_name: str = Field("Unknown", description="Last name")
+    phone_number: str = Field("Not provided", description="Phone number")
+    street_address: str = Field("Not provided", description="Street address including number")
+    apartment_number: Optional[str] = Field(None, description="Apartment/unit number")
+    city: str = Field("Unknown", description="City")
+    state: str = Field("Unknown", description="State/Province")
+    country: str = Field("Unknown", description="Country")
+    zip_code: str = Field("00000", description="ZIP/Postal code")
+
+    @field_validator("*", mode="before")
+    @classmethod
+    def _coerce_missing(cls, value, info):
+        """Fold AI 'missing' markers into the field defaults during validation"""
+        if isinstance(value, str):
+            value = value.strip()
+        if info.field_name == "apartment_number":
+            # apartment_number is genuinely optional; normalize empties to None
+            return None if value in (None, "", "null") else value
+        if value is None or value == "":
+            return cls.model_fields[info.field_name].default
+        return value
+
+
+class UserProfile(BaseModel):
+    id: int
+    first_name: str
+    last_name: str
+    phone_number: str
+    street_address: str
+    apartment_number: Optional[str] = None
+    city: str
+    state: str
+    country: str
+    zip_code: str
     created_at: str
\ No newline at end of file
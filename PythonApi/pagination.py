@@ -0,0 +1,17 @@
+"""Shared response assembly for paginated movie listings."""
+from typing import List
+
+from models import Movie, PaginatedMovieResponse
+
+
+def paginated(movies: List[Movie], total: int, page: int, size: int) -> PaginatedMovieResponse:
+    """Wrap one page of movies in the standard pagination envelope"""
+    return PaginatedMovieResponse.model_construct(
+        items=movies,
+        total=total,
+        page=page,
+        size=size,
+        # Ceiling division in pure integer math; empty results still report
+        # one page, as before
+        pages=((total + size - 1) // size) or 1,
+    )
@@ -1,348 +1,333 @@
-import pytest
-import sys
-from pathlib import Path
-sys.path.append(str(Path(__file__).parent.parent))
-
-from fastapi.testclient import TestClient
-from main import app
-from database import db
-
-
-@pytest.fixture(autouse=True)
-def reset_database():
-    """Reset the database before each test"""
-    db._movies.clear()
-    db._next_id = 1
-    yield
-    db._movies.clear()
-    db._next_id = 1
-
-
-class TestMovieAPI:
-    """Integration tests for the Movie API endpoints"""
-    
-    def setup_method(self):
-        """Create a test client for each test"""
-        self.client = TestClient(app)
-    
-    def test_get_empty_movies(self):
-        """Test getting movies when database is empty"""
-        response = self.client.get("/api/Movies")
-        assert response.status_code == 200
-        data = response.json()
-        assert data["items"] == []
-        assert data["total"] == 0
-        assert data["page"] == 1
-        assert data["size"] == 20
-    
-    def test_create_movie(self):
-        """Test creating a new movie"""
-        movie_data = {
-            "title": "Test Movie",
-            "overview": "A test movie for testing purposes",
-            "release_date": "2023-01-01",
-            "vote_average": 8.5,
-            "runtime": 120
-        }
-        
-        response = self.client.post("/api/Movies", json=movie_data)
-        assert response.status_code == 200
-        movie_id = response.json()
-        assert movie_id == 1
-        
-        # Verify it was created
-        response = self.client.get("/api/Movies")
-        assert response.status_code == 200
-        data = response.json()
-        assert data["total"] == 1
-        movie = data["items"][0]
-        assert movie["id"] == 1
-        assert movie["title"] == "Test Movie"
-        assert movie["overview"] == "A test movie for testing purposes"
-        assert movie["is_favorite"] == False
-    
-    def test_get_movie_by_id(self):
-        """Test getting a specific movie by ID"""
-        # Create a movie first
-        movie_data = {"title": "Test Movie", "overview": "Test overview"}
-        create_response = self.client.post("/api/Movies", json=movie_data)
-        movie_id = create_response.json()
-        
-        # Get the movie by ID
-        response = self.client.get(f"/api/Movies/{movie_id}")
-        assert response.status_code == 200
-        movie = response.json()
-        assert movie["id"] == movie_id
-        assert movie["title"] == "Test Movie"
-    
-    def test_get_nonexistent_movie(self):
-        """Test getting a movie that doesn't exist"""
-        response = self.client.get("/api/Movies/999")
-        assert response.status_code == 404
-        assert response.json()["detail"] == "Movie not found"
-    
-    def test_update_movie(self):
-        """Test updating an existing movie"""
-        # Create a movie
-        movie_data = {"title": "Original Title"}
-        create_response = self.client.post("/api/Movies", json=movie_data)
-        movie_id = create_response.json()
-        
-        # Update it
-        update_data = {
-            "title": "Updated Title",
-            "is_favorite": True,
-            "personal_rating": 9.0,
-            "personal_notes": "Great movie!"
-        }
-        
-        update_response = self.client.put(f"/api/Movies/{movie_id}", json=update_data)
-        assert update_response.status_code == 200
-        
-        # Verify the update
-        response = self.client.get(f"/api/Movies/{movie_id}")
-        movie = response.json()
-        assert movie["title"] == "Updated Title"
-        assert movie["is_favorite"] == True
-        assert movie["personal_rating"] == 9.0
-        assert movie["personal_notes"] == "Great movie!"
-    
-    def test_update_nonexistent_movie(self):
-        """Test updating a movie that doesn't exist"""
-        response = self.client.put(
-            "/api/Movies/999",
-            json={"title": "Updated", "is_favorite": True}
-        )
-        assert response.status_code == 404
-        assert response.json()["detail"] == "Movie not found"
-    
-    def test_delete_movie(self):
-        """Test deleting an existing movie"""
-        # Create two movies
-        movie1 = self.client.post("/api/Movies", json={"title": "Movie 1"})
-        id1 = movie1.json()
-        movie2 = self.client.post("/api/Movies", json={"title": "Movie 2"})
-        id2 = movie2.json()
-        
-        # Delete the first one
-        delete_response = self.client.delete(f"/api/Movies/{id1}")
-        assert delete_response.status_code == 200
-        
-        # Verify only second remains
-        response = self.client.get("/api/Movies")
-        data = response.json()
-        assert data["total"] == 1
-        assert data["items"][0]["id"] == id2
-        assert data["items"][0]["title"] == "Movie 2"
-    
-    def test_delete_nonexistent_movie(self):
-        """Test deleting a movie that doesn't exist"""
-        response = self.client.delete("/api/Movies/999")
-        assert response.status_code == 404
-        assert response.json()["detail"] == "Movie not found"
-    
-    def test_toggle_favorite(self):
-        """Test toggling favorite status of a movie"""
-        # Create a movie
-        movie_data = {"title": "Test Movie"}
-        create_response = self.client.post("/api/Movies", json=movie_data)
-        movie_id = create_response.json()
-        
-        # Toggle favorite (should become True)
-        response = self.client.post(f"/api/Movies/{movie_id}/favorite")
-        assert response.status_code == 200
-        assert response.json()["is_favorite"] == True
-        
-        # Toggle again (should become False)
-        response = self.client.post(f"/api/Movies/{movie_id}/favorite")
-        assert response.status_code == 200
-        assert response.json()["is_favorite"] == False
-    
-    def test_get_favorite_movies(self):
-        """Test getting only favorite movies"""
-        # Create movies with different favorite status
-        movie1 = self.client.post("/api/Movies", json={"title": "Movie 1"})
-        id1 = movie1.json()
-        movie2 = self.client.post("/api/Movies", json={"title": "Movie 2"})
-        id2 = movie2.json()
-        movie3 = self.client.post("/api/Movies", json={"title": "Movie 3"})
-        id3 = movie3.json()
-        
-        # Mark movies 1 and 3 as favorites
-        self.client.post(f"/api/Movies/{id1}/favorite")
-        self.client.post(f"/api/Movies/{id3}/favorite")
-        
-        # Get favorites
-        response = self.client.get("/api/Movies/favorites")
-        assert response.status_code == 200
-        data = response.json()
-        assert data["total"] == 2
-        favorite_ids = [movie["id"] for movie in data["items"]]
-        assert id1 in favorite_ids
-        assert id3 in favorite_ids
-        assert id2 not in favorite_ids
-    
-    def test_search_movies(self):
-        """Test searching movies by title and overview"""
-        # Create test movies
-        movies = [
-            {"title": "Avatar", "overview": "A movie about blue aliens"},
-            {"title": "Titanic", "overview": "A ship sinks in the ocean"},
-            {"title": "The Matrix", "overview": "Reality is not what it seems"}
-        ]
-        
-        for movie in movies:
-            self.client.post("/api/Movies", json=movie)
-        
-        # Search by title
-        response = self.client.get("/api/Movies/search?q=Avatar")
-        assert response.status_code == 200
-        data = response.json()
-        assert data["total"] == 1
-        assert data["items"][0]["title"] == "Avatar"
-        
-        # Search by overview
-        response = self.client.get("/api/Movies/search?q=ship")
-        assert response.status_code == 200
-        data = response.json()
-        assert data["total"] == 1
-        assert data["items"][0]["title"] == "Titanic"
-        
-        # Search with no results
-        response = self.client.get("/api/Movies/search?q=nonexistent")
-        assert response.status_code == 200
-        data = response.json()
-        assert data["total"] == 0
-    
-    def test_pagination(self):
-        """Test pagination functionality"""
-        # Create 25 movies
-        for i in range(25):
-            self.client.post("/api/Movies", json={"title": f"Movie {i+1}"})
-        
-        # Get first page (default size 20)
-        response = self.client.get("/api/Movies")
-        data = response.json()
-        assert data["total"] == 25
-        assert data["page"] == 1
-        assert data["size"] == 20
-        assert data["pages"] == 2
-        assert len(data["items"]) == 20
-        
-        # Get second page
-        response = self.client.get("/api/Movies?page=2")
-        data = response.json()
-        assert data["total"] == 25
-        assert data["page"] == 2
-        assert data["size"] == 20
-        assert data["pages"] == 2
-        assert len(data["items"]) == 5
-        
-        # Test custom page size
-        response = self.client.get("/api/Movies?page=1&size=10")
-        data = response.json()
-        assert data["size"] == 10
-        assert len(data["items"]) == 10
-    
-    def test_filters(self):
-        """Test various filtering options"""
-        # Create movies with different attributes
-        movies = [
-            {
-                "title": "Action Movie 1",
-                "overview": "Explosions and car chases",
-                "release_date": "2020-01-01",
-                "vote_average": 7.5,
-                "runtime": 120,
-                "original_language": "en",
-                "genres": [{"id": 28, "name": "Action"}]
-            },
-            {
-                "title": "Drama Movie 1",
-                "overview": "Deep emotional story",
-                "release_date": "2019-01-01",
-                "vote_average": 8.5,
-                "runtime": 150,
-                "original_language": "fr",
-                "genres": [{"id": 18, "name": "Drama"}]
-            }
-        ]
-        
-        for movie in movies:
-            self.client.post("/api/Movies", json=movie)
-        
-        # Test year filter
-        response = self.client.get("/api/Movies?year_from=2020")
-        data = response.json()
-        assert data["total"] == 1
-        assert data["items"][0]["title"] == "Action Movie 1"
-        
-        # Test rating filter
-        response = self.client.get("/api/Movies?rating_from=8.0")
-        data = response.json()
-        assert data["total"] == 1
-        assert data["items"][0]["title"] == "Drama Movie 1"
-        
-        # Test language filter
-        response = self.client.get("/api/Movies?language=fr")
-        data = response.json()
-        assert data["total"] == 1
-        assert data["items"][0]["title"] == "Drama Movie 1"
-    
-    def test_get_stats(self):
-        """Test getting database statistics"""
-        # Create some test movies
-        movies = [
-            {
-                "title": "Action Movie",
-                "genres": [{"id": 28, "name": "Action"}],
-                "release_date": "2020-01-01"
-            },
-            {
-                "title": "Drama Movie", 
-                "genres": [{"id": 18, "name": "Drama"}],
-                "release_date": "2019-01-01"
-            }
-        ]
-        
-        for movie in movies:
-            create_response = self.client.post("/api/Movies", json=movie)
-            movie_id = create_response.json()
-            
-        # Mark one as favorite
-        self.client.post(f"/api/Movies/1/favorite")
-        
-        # Add personal rating to one
-        self.client.put("/api/Movies/2", json={"personal_rating": 9.0})
-        
-        # Get stats
-        response = self.client.get("/api/stats")
-        assert response.status_code == 200
-        stats = response.json()
-        
-        assert stats["total_movies"] == 2
-        assert stats["favorites_count"] == 1
-        assert stats["rated_count"] == 1
-        assert len(stats["top_genres"]) >= 2
-        assert any(genre[0] == "Action" for genre in stats["top_genres"])
-        assert any(genre[0] == "Drama" for genre in stats["top_genres"])
-    
-    def test_cors_headers(self):
-        """Test that CORS headers are properly set"""
-        response = self.client.get(
-            "/api/Movies",
-            headers={"Origin": "http://localhost:3000"}
-        )
-        assert response.status_code == 200
-        assert "access-control-allow-origin" in response.headers
-        assert response.headers["access-control-allow-origin"] == "*"
-    
-    def test_empty_title_handling(self):
-        """Test creating a movie with empty title"""
-        response = self.client.post("/api/Movies", json={"title": ""})
-        assert response.status_code == 200
-        
-        # Verify it was created with empty title
-        movies = self.client.get("/api/Movies").json()
-        assert movies["total"] == 1
+import asyncio
+
+import pytest
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from database import db
+
+
+def snapshot_catalog():
+    """Capture a deep copy of the current movie catalog for later restores"""
+    return [movie.model_copy(deep=True) for movie in db._movies], db._next_movie_id
+
+
+def restore_catalog(snapshot):
+    """Rebind the database to a previously captured catalog snapshot.
+
+    Read-only tests that share a seeded catalog build it once per module and
+    restore from the snapshot before each test, which is much cheaper than
+    re-seeding. Copies are handed out so one test mutating a movie cannot
+    leak into the next restore.
+    """
+    movies, next_movie_id = snapshot
+    with db._lock.write_locked():
+        db._movies = [movie.model_copy(deep=True) for movie in movies]
+        db._movies_by_id = {movie.id: movie for movie in db._movies}
+        db._next_movie_id = next_movie_id
+        db._loaded = True
+        db._stats_dirty = True
+        db._mark_views_stale()
+
+
+# Seed data for the read-only catalog tests; each catalog is built once per
+# module by the fixtures below and restored from a snapshot per test.
+SEARCH_MOVIES = [
+    {"title": "Avatar", "overview": "A movie about blue aliens"},
+    {"title": "Titanic", "overview": "A ship sinks in the ocean"},
+    {"title": "The Matrix", "overview": "Reality is not what it seems"}
+]
+
+FILTER_MOVIES = [
+    {
+        "title": "Action Movie 1",
+        "overview": "Explosions and car chases",
+        "release_date": "2020-01-01",
+        "vote_average": 7.5,
+        "runtime": 120,
+        "original_language": "en",
+        "genres": [{"id": 28, "name": "Action"}]
+    },
+    {
+        "title": "Drama Movie 1",
+        "overview": "Deep emotional story",
+        "release_date": "2019-01-01",
+        "vote_average": 8.5,
+        "runtime": 150,
+        "original_language": "fr",
+        "genres": [{"id": 18, "name": "Drama"}]
+    }
+]
+
+
+@pytest.fixture(scope="module")
+def search_catalog():
+    db.reset()
+    db.bulk_insert(SEARCH_MOVIES, skip_validation=True)
+    return snapshot_catalog()
+
+
+@pytest.fixture(scope="module")
+def filter_catalog():
+    db.reset()
+    db.bulk_insert(FILTER_MOVIES, skip_validation=True)
+    return snapshot_catalog()
+
+
+@pytest.fixture(scope="module")
+def pagination_catalog():
+    db.reset()
+    db.bulk_insert([{"title": f"Movie {i+1}"} for i in range(25)], skip_validation=True)
+    return snapshot_catalog()
+
+
+class TestMovieAPI:
+    """Integration tests for the Movie API endpoints"""
+
+    def test_get_empty_movies(self, client):
+        """Test getting movies when database is empty"""
+        response = client.get("/api/Movies")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["items"] == []
+        assert data["total"] == 0
+        assert data["page"] == 1
+        assert data["size"] == 20
+    
+    def test_create_movie(self, client):
+        """Test creating a new movie"""
+        movie_data = {
+            "title": "Test Movie",
+            "overview": "A test movie for testing purposes",
+            "release_date": "2023-01-01",
+            "vote_average": 8.5,
+            "runtime": 120
+        }
+        
+        response = client.post("/api/Movies", json=movie_data)
+        assert response.status_code == 200
+        movie_id = response.json()
+        assert movie_id == 1
+        
+        # Verify it was created
+        response = client.get("/api/Movies")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 1
+        movie = data["items"][0]
+        assert movie["id"] == 1
+        assert movie["title"] == "Test Movie"
+        assert movie["overview"] == "A test movie for testing purposes"
+        assert movie["is_favorite"] == False
+    
+    def test_get_movie_by_id(self, client, created_movie):
+        """Test getting a specific movie by ID"""
+        response = client.get(f"/api/Movies/{created_movie}")
+        assert response.status_code == 200
+        movie = response.json()
+        assert movie["id"] == created_movie
+        assert movie["title"] == "Test Movie"
+    
+    @pytest.mark.parametrize("method, kwargs", [
+        ("get", {}),
+        ("put", {"json": {"title": "Updated", "is_favorite": True}}),
+        ("delete", {}),
+    ])
+    def test_nonexistent_movie(self, client, method, kwargs):
+        """Test that get/update/delete 404 for a movie that doesn't exist"""
+        response = getattr(client, method)("/api/Movies/999", **kwargs)
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Movie not found"
+
+    @pytest.mark.parametrize("update_data", [
+        {"title": "Updated Title"},
+        {"is_favorite": True},
+        {"personal_rating": 9.0},
+        {"personal_notes": "Great movie!"},
+        {
+            "title": "Updated Title",
+            "is_favorite": True,
+            "personal_rating": 9.0,
+            "personal_notes": "Great movie!"
+        },
+    ])
+    def test_update_movie(self, client, created_movie, update_data):
+        """Test updating an existing movie, per field and all fields at once"""
+        update_response = client.put(f"/api/Movies/{created_movie}", json=update_data)
+        assert update_response.status_code == 200
+
+        # Verify the update
+        movie = client.get(f"/api/Movies/{created_movie}").json()
+        for field, value in update_data.items():
+            assert movie[field] == value
+    
+    def test_delete_movie(self, client, new_movie):
+        """Test deleting an existing movie"""
+        # Create two movies
+        id1 = new_movie("Movie 1")
+        id2 = new_movie("Movie 2")
+
+        # Delete the first one
+        delete_response = client.delete(f"/api/Movies/{id1}")
+        assert delete_response.status_code == 200
+        
+        # Verify only second remains
+        response = client.get("/api/Movies")
+        data = response.json()
+        assert data["total"] == 1
+        assert data["items"][0]["id"] == id2
+        assert data["items"][0]["title"] == "Movie 2"
+    
+    def test_toggle_favorite(self, client, created_movie):
+        """Test toggling favorite status of a movie"""
+        # First toggle turns the flag on, second turns it back off
+        url = f"/api/Movies/{created_movie}/favorite"
+        for expected in (True, False):
+            response = client.post(url)
+            assert response.status_code == 200
+            assert response.json()["is_favorite"] == expected
+    
+    @pytest.mark.asyncio
+    async def test_get_favorite_movies(self, async_client):
+        """Test getting only favorite movies"""
+        # Create movies with different favorite status, concurrently
+        responses = await asyncio.gather(*(
+            async_client.post("/api/Movies", json={"title": f"Movie {i}"})
+            for i in (1, 2, 3)
+        ))
+        id1, id2, id3 = (response.json() for response in responses)
+
+        # Mark movies 1 and 3 as favorites
+        await asyncio.gather(
+            async_client.post(f"/api/Movies/{id1}/favorite"),
+            async_client.post(f"/api/Movies/{id3}/favorite"),
+        )
+
+        # Get favorites
+        response = await async_client.get("/api/Movies/favorites")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 2
+        favorite_ids = {movie["id"] for movie in data["items"]}
+        assert favorite_ids == {id1, id3}
+    
+    @pytest.mark.parametrize("query, expected_titles", [
+        ("Avatar", ["Avatar"]),        # match by title
+        ("ship", ["Titanic"]),         # match by overview
+        ("nonexistent", []),           # no results
+    ])
+    def test_search_movies(self, client, search_catalog, query, expected_titles):
+        """Test searching movies by title and overview"""
+        restore_catalog(search_catalog)
+
+        response = client.get(f"/api/Movies/search?q={query}")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == len(expected_titles)
+        assert [movie["title"] for movie in data["items"]] == expected_titles
+    
+    def test_pagination(self, client, pagination_catalog):
+        """Test pagination functionality"""
+        restore_catalog(pagination_catalog)
+
+        # Get first page (default size 20)
+        response = client.get("/api/Movies")
+        data = response.json()
+        assert data["total"] == 25
+        assert data["page"] == 1
+        assert data["size"] == 20
+        assert data["pages"] == 2
+        assert len(data["items"]) == 20
+
+        # Get second page
+        response = client.get("/api/Movies?page=2")
+        data = response.json()
+        assert data["total"] == 25
+        assert data["page"] == 2
+        assert data["size"] == 20
+        assert data["pages"] == 2
+        assert len(data["items"]) == 5
+
+        # Test custom page size
+        response = client.get("/api/Movies?page=1&size=10")
+        data = response.json()
+        assert data["size"] == 10
+        assert len(data["items"]) == 10
+    
+    def test_filters(self, client, filter_catalog):
+        """Test various filtering options"""
+        restore_catalog(filter_catalog)
+
+        # Test year filter
+        response = client.get("/api/Movies?year_from=2020")
+        data = response.json()
+        assert data["total"] == 1
+        assert data["items"][0]["title"] == "Action Movie 1"
+        
+        # Test rating filter
+        response = client.get("/api/Movies?rating_from=8.0")
+        data = response.json()
+        assert data["total"] == 1
+        assert data["items"][0]["title"] == "Drama Movie 1"
+        
+        # Test language filter
+        response = client.get("/api/Movies?language=fr")
+        data = response.json()
+        assert data["total"] == 1
+        assert data["items"][0]["title"] == "Drama Movie 1"
+    
+    def test_get_stats(self, client):
+        """Test getting database statistics"""
+        # Create some test movies
+        movies = [
+            {
+                "title": "Action Movie",
+                "genres": [{"id": 28, "name": "Action"}],
+                "release_date": "2020-01-01"
+            },
+            {
+                "title": "Drama Movie", 
+                "genres": [{"id": 18, "name": "Drama"}],
+                "release_date": "2019-01-01"
+            }
+        ]
+        action_id, drama_id = db.bulk_insert(movies, skip_validation=True)
+
+        # Mark one as favorite
+        client.post(f"/api/Movies/{action_id}/favorite")
+
+        # Add personal rating to one
+        client.put(f"/api/Movies/{drama_id}", json={"personal_rating": 9.0})
+        
+        # Get stats
+        response = client.get("/api/stats")
+        assert response.status_code == 200
+        stats = response.json()
+        
+        assert stats["total_movies"] == 2
+        assert stats["favorites_count"] == 1
+        assert stats["rated_count"] == 1
+        assert len(stats["top_genres"]) >= 2
+        top_genre_names = {genre[0] for genre in stats["top_genres"]}
+        assert {"Action", "Drama"} <= top_genre_names
+    
+    def test_cors_headers(self, client):
+        """Test that CORS headers are properly set"""
+        response = client.get(
+            "/api/Movies",
+            headers={"Origin": "http://localhost:3000"}
+        )
+        assert response.status_code == 200
+        assert "access-control-allow-origin" in response.headers
+        assert response.headers["access-control-allow-origin"] == "*"
+    
+    def test_empty_title_handling(self, client):
+        """Test creating a movie with empty title"""
+        response = client.post("/api/Movies", json={"title": ""})
+        assert response.status_code == 200
+        
+        # Verify it was created with empty title
+        movies = client.get("/api/Movies").json()
+        assert movies["total"] == 1
         assert movies["items"][0]["title"] == ""
\ No newline at end of file